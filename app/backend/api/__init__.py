@@ -4,3 +4,10 @@ from .posts import posts_bp
 from .feed import feed_bp
 from .jobs import jobs_bp
 from .messaging import messaging_bp
+from .export import export_bp
+from .connections import connections_bp
+from .sync import sync_bp
+from .notifications import notifications_bp
+from .push import push_bp
+from .presence import presence_bp
+from .health import health_bp
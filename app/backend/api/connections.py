@@ -0,0 +1,111 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy.orm import aliased
+from app.backend.extensions import db
+from app.backend.models.user import User
+from app.backend.models.connection import Connection, ConnectionSuggestion
+from app.backend.api.pagination import keyset_page, decode_cursor, InvalidCursor
+from app.backend.api.serializers import load_users_and_profiles
+
+connections_bp = Blueprint('connections', __name__)
+
+def serialize_people(user_ids, extra=None):
+    users, profiles = load_users_and_profiles(user_ids)
+    people = []
+    for user_id in user_ids:
+        user = users.get(user_id)
+        profile = profiles.get(user_id)
+        person = {
+            'id': user_id,
+            'name': user.username if user else None,
+            'avatar': profile.image if profile else None,
+            'job_title': profile.job_title if profile else None
+        }
+        if extra:
+            person.update(extra.get(user_id, {}))
+        people.append(person)
+    return people
+
+@connections_bp.route('/<int:other_id>', methods=['POST'])
+@jwt_required()
+def connect(other_id):
+    """Send a connection request, or accept one the other user already sent"""
+    user_id = int(get_jwt_identity())
+    if other_id == user_id:
+        return jsonify({'error': 'Cannot connect to yourself'}), 400
+    if not db.session.get(User, other_id):
+        return jsonify({'error': 'User not found'}), 404
+    outgoing = db.session.get(Connection, (user_id, other_id))
+    if outgoing:
+        return jsonify({'status': outgoing.status}), 200
+    incoming = db.session.get(Connection, (other_id, user_id))
+    if incoming:
+        incoming.status = 'accepted'
+        db.session.add(Connection(user_id=user_id, friend_id=other_id, status='accepted'))
+        db.session.commit()
+        return jsonify({'status': 'accepted'}), 201
+    db.session.add(Connection(user_id=user_id, friend_id=other_id, status='pending'))
+    db.session.commit()
+    return jsonify({'status': 'pending'}), 201
+
+@connections_bp.route('/<int:other_id>/accept', methods=['POST'])
+@jwt_required()
+def accept(other_id):
+    user_id = int(get_jwt_identity())
+    incoming = db.session.get(Connection, (other_id, user_id))
+    if not incoming:
+        return jsonify({'error': 'No connection request from this user'}), 404
+    if incoming.status != 'accepted':
+        incoming.status = 'accepted'
+        db.session.merge(Connection(user_id=user_id, friend_id=other_id, status='accepted'))
+        db.session.commit()
+    return jsonify({'status': 'accepted'}), 200
+
+@connections_bp.route('/', methods=['GET'])
+@jwt_required()
+def list_connections():
+    """Connections of ?user_id= (default: current user), newest first"""
+    user_id = request.args.get('user_id', type=int) or int(get_jwt_identity())
+    per_page = min(request.args.get('per_page', 20, type=int), 100)
+    cursor = None
+    token = request.args.get('cursor', '', type=str)
+    if token:
+        try:
+            cursor = decode_cursor(token)
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    query = Connection.query.filter_by(user_id=user_id, status='accepted')
+    edges, next_cursor = keyset_page(query, Connection.created_at, Connection.friend_id, cursor=cursor, limit=per_page)
+    return jsonify({
+        'connections': serialize_people([e.friend_id for e in edges]),
+        'next_cursor': next_cursor,
+        'per_page': per_page
+    })
+
+@connections_bp.route('/requests', methods=['GET'])
+@jwt_required()
+def list_requests():
+    """Pending requests sent to the current user"""
+    user_id = int(get_jwt_identity())
+    edges = Connection.query.filter_by(friend_id=user_id, status='pending').order_by(Connection.created_at.desc()).limit(100).all()
+    return jsonify(serialize_people([e.user_id for e in edges]))
+
+@connections_bp.route('/mutual/<int:other_id>', methods=['GET'])
+@jwt_required()
+def mutual_connections(other_id):
+    """Connections shared by the current user and another user, in one self-join"""
+    user_id = int(get_jwt_identity())
+    theirs = aliased(Connection)
+    rows = db.session.query(Connection.friend_id).join(
+        theirs, (theirs.friend_id == Connection.friend_id) & (theirs.user_id == other_id) & (theirs.status == 'accepted')
+    ).filter(Connection.user_id == user_id, Connection.status == 'accepted').order_by(Connection.friend_id).limit(100).all()
+    return jsonify(serialize_people([r.friend_id for r in rows]))
+
+@connections_bp.route('/suggestions', methods=['GET'])
+@jwt_required()
+def suggestions():
+    """Precomputed "people you may know" for the current user"""
+    user_id = int(get_jwt_identity())
+    rows = ConnectionSuggestion.query.filter_by(user_id=user_id).order_by(ConnectionSuggestion.rank).all()
+    mutual = {r.candidate_id: {'mutual_count': r.mutual_count} for r in rows}
+    return jsonify(serialize_people([r.candidate_id for r in rows], mutual))
@@ -0,0 +1,22 @@
+from flask import Blueprint, Response, request, stream_with_context
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.backend.services.export import iter_user_records, iter_ndjson
+
+export_bp = Blueprint('export', __name__)
+
+@export_bp.route('/', methods=['GET'])
+@jwt_required()
+def export_data():
+    """Stream the current user's profile, posts and comments as NDJSON"""
+    user_id = int(get_jwt_identity())
+    compress = request.args.get('gzip', '').lower() in ('1', 'true', 'yes')
+    chunks = iter_ndjson(iter_user_records(user_id), compress)
+    if compress:
+        mimetype, filename = 'application/gzip', f'export-{user_id}.ndjson.gz'
+    else:
+        mimetype, filename = 'application/x-ndjson', f'export-{user_id}.ndjson'
+    return Response(
+        stream_with_context(chunks),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
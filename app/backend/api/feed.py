@@ -1,9 +1,70 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
 from app.backend.extensions import db
 from app.backend.models.post import Post
 from app.backend.models.user import User
 from app.backend.models.profile import Profile
+from app.backend.api.pagination import encode_cursor, decode_cursor, InvalidCursor
+from app.backend.api.serializers import serialize_posts
+from app.backend.services.timeline import read_timeline, ranked_timeline
+from app.backend.services.seen import SeenFilter
+from app.backend.services.views import record_views
 
 feed_bp = Blueprint('feed', __name__)
- 
-# Routes will be implemented here 
\ No newline at end of file
+
+@feed_bp.route('/', methods=['GET'])
+@jwt_required()
+def home_feed():
+    """Current user's home timeline, newest first or ranked with ?sort=ranked
+
+    Posts already served to the user recently are skipped unless
+    ?include_seen=1 is passed.
+    """
+    user_id = int(get_jwt_identity())
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+    ranked = request.args.get('sort', 'recent', type=str) == 'ranked'
+    include_seen = request.args.get('include_seen', '').lower() in ('1', 'true', 'yes')
+    seen = None
+    if current_app.config.get('FEED_SEEN_FILTER', True) and not include_seen:
+        seen = SeenFilter(user_id)
+    cursor = None
+    token = request.args.get('cursor', '', type=str)
+    if token:
+        try:
+            cursor = decode_cursor(token)
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    offset = 0
+    if ranked and cursor:
+        # Ranked cursors carry a position in the cached ranking
+        try:
+            offset = int(cursor[0])
+        except (TypeError, ValueError):
+            offset = -1
+        if offset < 0:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    if ranked:
+        # The first page re-ranks; later pages walk the cached ranking by position
+        ranked_ids = ranked_timeline(user_id, refresh=cursor is None, skip=seen)
+        post_ids = ranked_ids[offset:offset + per_page]
+        has_more = offset + per_page < len(ranked_ids)
+        next_cursor = encode_cursor(offset + per_page, post_ids[-1]) if has_more and post_ids else None
+    else:
+        post_ids = read_timeline(user_id, before_id=cursor[1] if cursor else None, limit=per_page, skip=seen)
+        next_cursor = encode_cursor(post_ids[-1], post_ids[-1]) if len(post_ids) == per_page else None
+
+    # Posts served now are skipped on later reloads
+    if seen is not None:
+        seen.mark(post_ids)
+    record_views(post_ids, f'user:{user_id}')
+
+    # One batched hydrate query, then restore timeline order
+    posts = {p.id: p for p in Post.query.filter(Post.id.in_(post_ids))} if post_ids else {}
+    ordered = [posts[i] for i in post_ids if i in posts]
+    return jsonify({
+        'posts': serialize_posts(ordered),
+        'next_cursor': next_cursor,
+        'per_page': per_page
+    })
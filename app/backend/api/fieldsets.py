@@ -0,0 +1,34 @@
+from flask import request
+
+
+class InvalidFieldset(ValueError):
+    pass
+
+
+def parse_fieldset(name, allowed):
+    """Read a comma-separated `?name=` list restricted to `allowed`.
+
+    Returns None when the parameter is absent, meaning "everything".
+    """
+    raw = request.args.get(name)
+    if raw is None:
+        return None
+    requested = [f.strip() for f in raw.split(',') if f.strip()]
+    unknown = [f for f in requested if f not in allowed]
+    if unknown:
+        raise InvalidFieldset(f"Unknown {name}: {', '.join(unknown)}")
+    return requested
+
+
+def parse_fields_and_include(fields_allowed, include_allowed):
+    """Parse ?fields= and ?include= together.
+
+    With neither, everything is returned. Asking for specific fields drops
+    relationships unless they are named in include; include alone keeps
+    every field.
+    """
+    fields = parse_fieldset('fields', fields_allowed)
+    include = parse_fieldset('include', include_allowed)
+    if fields is not None and include is None:
+        include = []
+    return fields, include
@@ -0,0 +1,26 @@
+import os
+from flask import Blueprint, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.backend.extensions import cache
+
+health_bp = Blueprint('health', __name__)
+
+@health_bp.route('/cache', methods=['GET'])
+@jwt_required()
+def cache_stats():
+    """Hit and miss counts of the shared cache, for the users in ADMIN_USER_IDS
+
+    Counters live in each gunicorn worker, so the numbers are those of the
+    worker that answered (its pid is included).
+    """
+    if int(get_jwt_identity()) not in current_app.config.get('ADMIN_USER_IDS', ()):
+        return jsonify({'error': 'Forbidden'}), 403
+    stats = cache.stats()
+    lookups = stats['hits'] + stats['misses']
+    return jsonify({
+        'backend': current_app.config.get('CACHE_BACKEND', 'memory'),
+        'pid': os.getpid(),
+        'hits': stats['hits'],
+        'misses': stats['misses'],
+        'hit_rate': round(stats['hits'] / lookups, 3) if lookups else None
+    })
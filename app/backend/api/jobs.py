@@ -1,7 +1,59 @@
 from flask import Blueprint, request, jsonify
 from app.backend.extensions import db
 from app.backend.models.job import Job
+from app.backend.api.pagination import keyset_page, decode_cursor, InvalidCursor
+from app.backend.services.jobs import search_jobs, facet_counts
 
 jobs_bp = Blueprint('jobs', __name__)
- 
-# Routes will be implemented here 
\ No newline at end of file
+
+def serialize_job(job):
+    return {
+        'id': job.id,
+        'title': job.title,
+        'description': job.description,
+        'company': job.company,
+        'location': job.location,
+        'posted_at': job.posted_at
+    }
+
+@jobs_bp.route('/', methods=['GET'])
+def list_jobs():
+    """Jobs newest first, filtered by ?q=, ?company= and ?location= (both repeatable)
+
+    Facet counts per company and location are returned with every page
+    unless ?facets=0.
+    """
+    term = request.args.get('q', '', type=str).strip()
+    companies = [c for c in request.args.getlist('company') if c]
+    locations = [l for l in request.args.getlist('location') if l]
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+    cursor = None
+    token = request.args.get('cursor', '', type=str)
+    if token:
+        try:
+            cursor = decode_cursor(token)
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    query = Job.query
+    if term:
+        query = search_jobs(query, term)
+    if companies:
+        query = query.filter(Job.company.in_(companies))
+    if locations:
+        query = query.filter(Job.location.in_(locations))
+    jobs, next_cursor = keyset_page(query, Job.posted_at, Job.id, cursor=cursor, limit=per_page)
+    result = {
+        'jobs': [serialize_job(j) for j in jobs],
+        'next_cursor': next_cursor,
+        'per_page': per_page
+    }
+    if request.args.get('facets', 1, type=int):
+        result['facets'] = facet_counts(companies, locations, term)
+    return jsonify(result)
+
+@jobs_bp.route('/<int:job_id>', methods=['GET'])
+def get_job(job_id):
+    job = db.session.get(Job, job_id)
+    if not job:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify(serialize_job(job))
@@ -1,8 +1,156 @@
 from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import select, union_all
 from app.backend.extensions import db
+from app.backend.models.conversation import Conversation
 from app.backend.models.message import Message
 from app.backend.models.user import User
+from app.backend.api.pagination import keyset_filter, archive_keyset_page, encode_cursor, decode_cursor, InvalidCursor
+from app.backend.api.serializers import load_users_and_profiles, serialize_message
+from app.backend.services.messaging import conversation_between, send_message, mark_read
+from app.backend.services.push import hub
 
 messaging_bp = Blueprint('messaging', __name__)
- 
-# Routes will be implemented here 
\ No newline at end of file
+
+def parse_cursor():
+    """(cursor, error response) from ?cursor="""
+    token = request.args.get('cursor', '', type=str)
+    if not token:
+        return None, None
+    try:
+        return decode_cursor(token), None
+    except InvalidCursor:
+        return None, (jsonify({'error': 'Invalid cursor'}), 400)
+
+def inbox_page(user_id, cursor=None, limit=20):
+    """A page of the user's conversations, most recent message first.
+
+    The user is either participant, so the page merges two limited range
+    reads, one per (user_x_id, last_sent_at, id) index, in one statement.
+    """
+    sides = []
+    for column in (Conversation.user_a_id, Conversation.user_b_id):
+        side = select(Conversation.id, Conversation.last_sent_at).where(
+            column == user_id, Conversation.last_sent_at.isnot(None)
+        )
+        if cursor is not None:
+            side = side.where(keyset_filter(Conversation.last_sent_at, Conversation.id, cursor))
+        side = side.order_by(Conversation.last_sent_at.desc(), Conversation.id.desc()).limit(limit + 1)
+        sides.append(select(side.subquery()))
+    merged = union_all(*sides).subquery()
+    ids = db.session.execute(
+        select(merged.c.id).order_by(merged.c.last_sent_at.desc(), merged.c.id.desc()).limit(limit + 1)
+    ).scalars().all()
+    conversations = {c.id: c for c in Conversation.query.filter(Conversation.id.in_(ids[:limit]))} if ids else {}
+    page = [conversations[i] for i in ids[:limit] if i in conversations]
+    next_cursor = None
+    if len(ids) > limit and page:
+        next_cursor = encode_cursor(page[-1].last_sent_at, page[-1].id)
+    return page, next_cursor
+
+def serialize_conversations(conversations, user_id):
+    others = [c.other_participant(user_id) for c in conversations]
+    users, profiles = load_users_and_profiles(others)
+    last_ids = [c.last_message_id for c in conversations if c.last_message_id]
+    last_messages = {m.id: m for m in Message.query.filter(Message.id.in_(last_ids))} if last_ids else {}
+    items = []
+    for conversation, other_id in zip(conversations, others):
+        user = users.get(other_id)
+        profile = profiles.get(other_id)
+        last = last_messages.get(conversation.last_message_id)
+        items.append({
+            'id': conversation.id,
+            'other_user': {
+                'id': other_id,
+                'name': user.username if user else None,
+                'avatar': profile.image if profile else None
+            },
+            'last_message': serialize_message(last) if last else None,
+            'last_sent_at': conversation.last_sent_at,
+            'unread_count': conversation.unread_for(user_id)
+        })
+    return items
+
+def deliver(message):
+    """Push a sent message to both participants' open connections"""
+    hub.publish((message.receiver_id, message.sender_id), 'message', serialize_message(message))
+
+def get_participating(conversation_id, user_id):
+    conversation = db.session.get(Conversation, conversation_id)
+    if conversation is None or not conversation.has_participant(user_id):
+        return None
+    return conversation
+
+@messaging_bp.route('/conversations', methods=['GET'])
+@jwt_required()
+def inbox():
+    user_id = int(get_jwt_identity())
+    per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+    cursor, error = parse_cursor()
+    if error:
+        return error
+    conversations, next_cursor = inbox_page(user_id, cursor, per_page)
+    return jsonify({
+        'conversations': serialize_conversations(conversations, user_id),
+        'next_cursor': next_cursor,
+        'per_page': per_page
+    })
+
+@messaging_bp.route('/<int:conversation_id>', methods=['GET'])
+@jwt_required()
+def history(conversation_id):
+    """Messages of a conversation, newest first; the first page marks it read"""
+    user_id = int(get_jwt_identity())
+    conversation = get_participating(conversation_id, user_id)
+    if conversation is None:
+        return jsonify({'error': 'Conversation not found'}), 404
+    per_page = min(max(request.args.get('per_page', 50, type=int), 1), 100)
+    cursor, error = parse_cursor()
+    if error:
+        return error
+    query = Message.query.filter_by(conversation_id=conversation.id)
+    try:
+        messages, next_cursor = archive_keyset_page(
+            query, 'message', Message.sent_at, Message.id, cursor=cursor, limit=per_page,
+            match={'conversation_id': conversation.id}
+        )
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    if cursor is None and conversation.unread_for(user_id):
+        mark_read(conversation, user_id)
+    return jsonify({
+        'messages': [serialize_message(m) for m in messages],
+        'next_cursor': next_cursor,
+        'per_page': per_page
+    })
+
+@messaging_bp.route('/<int:conversation_id>', methods=['POST'])
+@jwt_required()
+def send(conversation_id):
+    user_id = int(get_jwt_identity())
+    conversation = get_participating(conversation_id, user_id)
+    if conversation is None:
+        return jsonify({'error': 'Conversation not found'}), 404
+    content = (request.get_json(silent=True) or {}).get('content')
+    if not content:
+        return jsonify({'error': 'Content required'}), 400
+    message = send_message(conversation, user_id, content)
+    deliver(message)
+    return jsonify(serialize_message(message)), 201
+
+@messaging_bp.route('/to/<int:other_id>', methods=['POST'])
+@jwt_required()
+def send_to_user(other_id):
+    """Send a message to a user, starting the conversation if needed"""
+    user_id = int(get_jwt_identity())
+    if other_id == user_id:
+        return jsonify({'error': 'Cannot message yourself'}), 400
+    content = (request.get_json(silent=True) or {}).get('content')
+    if not content:
+        return jsonify({'error': 'Content required'}), 400
+    if not db.session.get(User, other_id):
+        return jsonify({'error': 'User not found'}), 404
+    conversation = conversation_between(user_id, other_id)
+    message = send_message(conversation, user_id, content)
+    deliver(message)
+    return jsonify(serialize_message(message)), 201
@@ -0,0 +1,80 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from sqlalchemy import update
+from app.backend.extensions import db
+from app.backend.models.notification import Notification
+from app.backend.api.pagination import keyset_page, decode_cursor, InvalidCursor
+from app.backend.api.serializers import load_users_and_profiles
+from app.backend.services.notifications import unread_count, summary
+
+notifications_bp = Blueprint('notifications', __name__)
+
+def serialize_notifications(notifications):
+    actor_ids = {n: [int(a) for a in n.actor_ids.split(',')] if n.actor_ids else [] for n in notifications}
+    users, profiles = load_users_and_profiles(a for ids in actor_ids.values() for a in ids)
+    items = []
+    for n in notifications:
+        actors = [
+            {
+                'id': a,
+                'name': users[a].username if a in users else None,
+                'avatar': profiles[a].image if a in profiles else None
+            }
+            for a in actor_ids[n]
+        ]
+        items.append({
+            'id': n.id,
+            'type': n.type,
+            'post_id': n.post_id,
+            'count': n.count,
+            'actors': actors,
+            'summary': summary(n.type, n.count, [a['name'] for a in actors]),
+            'read': n.read,
+            'updated_at': n.updated_at
+        })
+    return items
+
+@notifications_bp.route('/', methods=['GET'])
+@jwt_required()
+def list_notifications():
+    """Current user's notifications, most recently updated first"""
+    user_id = int(get_jwt_identity())
+    per_page = min(request.args.get('per_page', 20, type=int), 100)
+    cursor = None
+    token = request.args.get('cursor', '', type=str)
+    if token:
+        try:
+            cursor = decode_cursor(token)
+        except InvalidCursor:
+            return jsonify({'error': 'Invalid cursor'}), 400
+    query = Notification.query.filter_by(recipient_id=user_id)
+    if request.args.get('unread', '').lower() in ('1', 'true', 'yes'):
+        query = query.filter_by(read=False)
+    notifications, next_cursor = keyset_page(query, Notification.updated_at, Notification.id, cursor=cursor, limit=per_page)
+    return jsonify({
+        'notifications': serialize_notifications(notifications),
+        'unread_count': unread_count(user_id),
+        'next_cursor': next_cursor,
+        'per_page': per_page
+    })
+
+@notifications_bp.route('/unread-count', methods=['GET'])
+@jwt_required()
+def get_unread_count():
+    return jsonify({'unread_count': unread_count(int(get_jwt_identity()))})
+
+@notifications_bp.route('/read', methods=['POST'])
+@jwt_required()
+def mark_read():
+    """Mark the notifications in {"ids": [...]} as read, or all of them without ids"""
+    user_id = int(get_jwt_identity())
+    data = request.get_json(silent=True) or {}
+    stmt = update(Notification).where(Notification.recipient_id == user_id, Notification.read.is_(False))
+    ids = data.get('ids')
+    if ids is not None:
+        if not isinstance(ids, list):
+            return jsonify({'error': 'ids must be a list'}), 400
+        stmt = stmt.where(Notification.id.in_(ids))
+    marked = db.session.execute(stmt.values(read=True)).rowcount
+    db.session.commit()
+    return jsonify({'marked': marked, 'unread_count': unread_count(user_id)})
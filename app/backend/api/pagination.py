@@ -0,0 +1,110 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_, select
+from app.backend.extensions import db
+from app.backend.services import archive
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(sort_value, row_id):
+    """Pack a (sort_value, id) pair into an opaque url-safe token."""
+    if isinstance(sort_value, datetime):
+        payload = {'t': sort_value.isoformat(), 'id': row_id}
+    else:
+        payload = {'v': sort_value, 'id': row_id}
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor. Raises InvalidCursor on malformed input."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+        row_id = int(payload['id'])
+        if 't' in payload:
+            return datetime.fromisoformat(payload['t']), row_id
+        return payload['v'], row_id
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor(str(e))
+
+
+def keyset_filter(sort_col, id_col, cursor, descending=True):
+    """Condition selecting rows strictly after `cursor` in (sort_col, id_col) order."""
+    sort_value, row_id = cursor
+    if descending:
+        return or_(sort_col < sort_value, and_(sort_col == sort_value, id_col < row_id))
+    return or_(sort_col > sort_value, and_(sort_col == sort_value, id_col > row_id))
+
+
+def keyset_page(query, sort_col, id_col, cursor=None, descending=True, limit=10, sort_key=None):
+    """Fetch one keyset page.
+
+    Returns (items, next_cursor). No COUNT(*) is issued; one extra row is
+    read to know whether another page exists. `sort_key` extracts the sort
+    value from a row and defaults to reading the column of the same name.
+    """
+    # A zero or negative LIMIT is unlimited on SQLite and a syntax error on MySQL
+    limit = max(limit, 1)
+    if cursor is not None:
+        query = query.filter(keyset_filter(sort_col, id_col, cursor, descending))
+    if descending:
+        query = query.order_by(sort_col.desc(), id_col.desc())
+    else:
+        query = query.order_by(sort_col.asc(), id_col.asc())
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and items:
+        last = items[-1]
+        value = sort_key(last) if sort_key else getattr(last, sort_col.key)
+        next_cursor = encode_cursor(value, getattr(last, id_col.key))
+    return items, next_cursor
+
+
+def archive_keyset_page(query, entity, sort_col, id_col, cursor=None, limit=10, match=None):
+    """Newest-first keyset page that continues into the entity's archive.
+
+    The hot query is read as in keyset_page. Month tables (services/archive.py)
+    are only queried while the page still reaches back to their newest row,
+    so pages inside the hot window cost no extra query beyond one small
+    partition lookup. `match` maps column names to the values the hot query
+    filters on, and is applied to the archive tables as equality filters.
+    Raises InvalidCursor when `cursor` does not hold a timestamp.
+    """
+    limit = max(limit, 1)
+    # Partitions are skipped by comparing their first day with the cursor
+    if cursor is not None and not isinstance(cursor[0], datetime):
+        raise InvalidCursor('cursor does not hold a timestamp')
+    if cursor is not None:
+        query = query.filter(keyset_filter(sort_col, id_col, cursor))
+    rows = query.order_by(sort_col.desc(), id_col.desc()).limit(limit + 1).all()
+
+    def key(row):
+        return getattr(row, sort_col.key), getattr(row, id_col.key)
+
+    model = archive.ENTITIES[entity][0]
+    for partition in archive.partitions(entity):
+        # Everything in this and older months sorts after the rows we already have
+        if len(rows) > limit and partition.max_at is not None and key(rows[limit])[0] > partition.max_at:
+            break
+        # Every row of the month is newer than the cursor: served on earlier pages
+        if cursor is not None and partition.starts_at > cursor[0]:
+            continue
+        table = archive.partition_table(partition)
+        stmt = select(table).where(*[table.c[name] == value for name, value in (match or {}).items()])
+        if cursor is not None:
+            stmt = stmt.where(keyset_filter(table.c[sort_col.key], table.c[id_col.key], cursor))
+        stmt = stmt.order_by(table.c[sort_col.key].desc(), table.c[id_col.key].desc()).limit(limit + 1)
+        rows.extend(archive.hydrate(model, db.session.execute(stmt), partition.month))
+        rows.sort(key=key, reverse=True)
+        del rows[limit + 1:]
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit and items:
+        next_cursor = encode_cursor(*key(items[-1]))
+    return items, next_cursor
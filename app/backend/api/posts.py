@@ -1,15 +1,29 @@
 from flask import Blueprint, request, jsonify, current_app, url_for
-from app.backend.extensions import db
+from app.backend.extensions import db, cache
 from app.backend.models.post import Post
 from app.backend.models.user import User
 import os
 from werkzeug.utils import secure_filename
 from datetime import datetime
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from app.backend.models.comment import Comment
+from app.backend.models.comment import Comment, MAX_DEPTH
 from app.backend.models.profile import Profile
-from sqlalchemy import desc, asc, func
-from functools import lru_cache
+from app.backend.models.tag import Tag, post_tag, MAX_TAGS_PER_POST
+from app.backend.models.post_like import PostLike
+from app.backend.api.serializers import serialize_posts, serialize_comments, serialize_comment_tree, post_columns, POST_FIELDS, POST_INCLUDES
+from app.backend.api.fieldsets import parse_fields_and_include, InvalidFieldset
+from app.backend.api.pagination import keyset_page, archive_keyset_page, keyset_filter, encode_cursor, decode_cursor, InvalidCursor
+from app.backend.services.search import search_posts
+from app.backend.services.likes import like_counter
+from app.backend.services.timeline import fan_out
+from app.backend.services.trending import record_tags, trending_tags
+from app.backend.services.views import record_views
+from app.backend.services.duplicates import check_duplicate, index_posts, to_signed
+from app.backend.services.notifications import notify
+from app.backend.services.archive import find_archived, archived_comments
+from sqlalchemy import desc, asc, func, event, update
+from sqlalchemy.orm import object_session, load_only
+from sqlalchemy.exc import IntegrityError
 
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif', 'mp4', 'mov', 'avi'}
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
@@ -17,33 +31,64 @@ UPLOAD_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '../../.
 
 posts_bp = Blueprint('posts', __name__)
 
-# Caching for categories and tags
-@lru_cache(maxsize=1)
+# Caching for categories and tags, shared across workers through the cache backend
+CATEGORIES_CACHE_KEY = 'posts:categories'
+POPULAR_TAGS_CACHE_KEY = 'posts:popular-tags'
+
+@cache.cached(CATEGORIES_CACHE_KEY)
 def get_categories():
-    try:
-        return [c[0] for c in db.session.query(Post.category).distinct() if c[0]]
-    except Exception:
-        return []
+    return [c[0] for c in db.session.query(Post.category).distinct() if c[0]]
 
-@lru_cache(maxsize=1)
+@cache.cached(POPULAR_TAGS_CACHE_KEY)
 def get_popular_tags():
-    try:
-        tag_counts = db.session.query(Post.tags, func.count(Post.id)).group_by(Post.tags).order_by(desc(func.count(Post.id))).limit(10).all()
-        tags = []
-        for tag_str, _ in tag_counts:
-            if tag_str:
-                tags.extend([t.strip() for t in tag_str.split(',') if t.strip()])
-        return list(set(tags))
-    except Exception:
-        return []
+    post_count = func.count(post_tag.c.post_id)
+    tag_counts = db.session.query(Tag.name, post_count).join(post_tag, post_tag.c.tag_id == Tag.id).group_by(Tag.id, Tag.name).order_by(desc(post_count)).limit(10).all()
+    return [name for name, _ in tag_counts]
+
+# Drop the cached aggregates once a post insert or delete is committed
+@event.listens_for(Post, 'after_insert')
+@event.listens_for(Post, 'after_delete')
+def _mark_post_aggregates_stale(mapper, connection, target):
+    object_session(target).info['post_aggregates_stale'] = True
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_post_aggregates(session):
+    if session.info.pop('post_aggregates_stale', False):
+        cache.delete(CATEGORIES_CACHE_KEY, POPULAR_TAGS_CACHE_KEY)
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_post_aggregates_flag(session):
+    session.info.pop('post_aggregates_stale', None)
 
 @posts_bp.route('/categories', methods=['GET'])
 def categories():
-    return jsonify(get_categories())
+    try:
+        return jsonify(get_categories())
+    except Exception:
+        return jsonify([])
 
 @posts_bp.route('/popular-tags', methods=['GET'])
 def popular_tags():
-    return jsonify(get_popular_tags())
+    try:
+        return jsonify(get_popular_tags())
+    except Exception:
+        return jsonify([])
+
+@posts_bp.route('/trending-tags', methods=['GET'])
+def get_trending_tags():
+    window = request.args.get('window', '24h', type=str)
+    top_k = current_app.config.get('TRENDING_TOP_K', 20)
+    limit = request.args.get('limit', top_k, type=int)
+    windows = current_app.config.get('TRENDING_WINDOWS') or {}
+    if window not in windows:
+        return jsonify({'error': f"Unknown window, expected one of: {', '.join(windows)}"}), 400
+    # Tracked candidates beyond the top k are not reliable enough to expose
+    if not 1 <= limit <= top_k:
+        return jsonify({'error': f'limit must be between 1 and {top_k}'}), 400
+    return jsonify({
+        'window': window,
+        'tags': [{'name': name, 'score': round(score, 3)} for name, score in trending_tags(window, limit)]
+    })
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -58,63 +103,60 @@ def validate_file(file):
         return True, ''
     return False, 'Invalid file type'
 
-def serialize_post(post):
-    user_profile = Profile.query.filter_by(user_id=post.user_id).first()
-    return {
-        'id': post.id,
-        'content': post.content,
-        'media_url': post.media_url,
-        'created_at': post.created_at.isoformat(),
-        'likes': post.likes,
-        'tags': post.tags.split(',') if post.tags else [],
-        'user': {
-            'id': post.user.id,
-            'name': post.user.username,
-            'avatar': user_profile.image if user_profile else None,
-            'job_title': user_profile.job_title if user_profile else None
-        },
-                    'comments': [
-                {
-                    'id': c.id,
-                    'user_id': c.user_id,
-                    'user_name': c.user.username,
-                    'user_avatar': c.user.profile.image if c.user.profile else None,
-                    'content': c.content,
-                    'created_at': c.created_at.isoformat()
-                } for c in post.comments
-            ]
-    }
-
 @posts_bp.route('/', methods=['POST'])
 @jwt_required()
 def create_post():
     user_id = get_jwt_identity()
     content = request.form.get('content')
+    tag_names = Tag.normalize(request.form.get('tags', ''))
     file = request.files.get('media')
     
     if not user_id or not content:
         return jsonify({'error': 'user_id and content are required'}), 400
-    
-    media_url = None
+    # Post.tags keeps the joined names for listings and ranking
+    if len(tag_names) > MAX_TAGS_PER_POST or len(','.join(tag_names)) > Post.tags.type.length:
+        return jsonify({'error': f'At most {MAX_TAGS_PER_POST} tags, {Post.tags.type.length} characters in total'}), 400
+
     if file:
         valid, msg = validate_file(file)
         if not valid:
             return jsonify({'error': msg}), 400
+
+    # Near-duplicates are rejected before anything is stored
+    fingerprint, duplicate_of, action = check_duplicate(content)
+    if action == 'reject':
+        return jsonify({'error': 'Duplicate post', 'duplicate_of': duplicate_of}), 409
+    
+    media_url = None
+    if file:
         filename = secure_filename(f"{datetime.utcnow().strftime('%Y%m%d%H%M%S')}_{file.filename}")
         os.makedirs(UPLOAD_FOLDER, exist_ok=True)
         file_path = os.path.join(UPLOAD_FOLDER, filename)
         file.save(file_path)
         media_url = url_for('posts.uploaded_file', filename=filename, _external=True)
     
-    post = Post(user_id=user_id, content=content, media_url=media_url)
+    post = Post(
+        user_id=user_id, content=content, media_url=media_url, tags=','.join(tag_names) or None,
+        simhash=to_signed(fingerprint) if fingerprint is not None else None,
+        duplicate_of=duplicate_of, collapsed=action == 'collapse'
+    )
+    post.tag_list = Tag.get_or_create(tag_names)
     db.session.add(post)
+    db.session.flush()
+    index_posts({post.id: fingerprint})
     db.session.commit()
+    # Collapsed duplicates stay out of timelines and trending tags
+    if not post.collapsed:
+        fan_out(post)
+        record_tags(tag_names)
     return jsonify({
         'id': post.id,
         'user_id': post.user_id,
         'content': post.content,
         'media_url': post.media_url,
-        'created_at': post.created_at.isoformat()
+        'tags': tag_names,
+        'duplicate_of': post.duplicate_of,
+        'created_at': post.created_at
     }), 201
 
 @posts_bp.route('/', methods=['GET'])
@@ -129,65 +171,93 @@ def list_posts():
     page = request.args.get('page', 1, type=int)
     per_page = request.args.get('per_page', 10, type=int)
     user_id = request.args.get('user_id', type=int)
+    try:
+        fields, include = parse_fields_and_include(POST_FIELDS.keys(), POST_INCLUDES)
+    except InvalidFieldset as e:
+        return jsonify({'error': str(e)}), 400
 
-    query = Post.query
+    # Only read the columns the requested fields need (plus the cursor sort key)
+    query = Post.query.options(load_only(*post_columns(fields, include), Post.created_at, Post.likes, Post.views))
+    query = query.filter(Post.collapsed.is_(False))
+    relevance = None
     if search:
-        query = query.filter(Post.content.ilike(f'%{search}%'))
+        query, relevance = search_posts(query, search)
     if category:
         query = query.filter(Post.category == category)
     if visibility:
         query = query.filter(Post.visibility == visibility)
-    if tags:
-        for tag in tags:
-            query = query.filter(Post.tags.ilike(f'%{tag}%'))
+    tag_names = Tag.normalize(tags)
+    if tag_names:
+        # Posts carrying every requested tag, resolved on the post_tag indexes
+        tagged = db.session.query(post_tag.c.post_id).join(Tag, Tag.id == post_tag.c.tag_id).filter(
+            Tag.name.in_(tag_names)
+        ).group_by(post_tag.c.post_id).having(func.count(post_tag.c.tag_id) == len(tag_names))
+        query = query.filter(Post.id.in_(tagged))
     if user_id:
         query = query.filter(Post.user_id == user_id)
 
+    # Cursor (keyset) mode: ?cursor= with an empty value starts from the top
+    if 'cursor' in request.args:
+        per_page = min(max(per_page, 1), 100)
+        if sort == 'likes':
+            sort_col, sort_key = func.coalesce(Post.likes, 0), lambda p: p.likes or 0
+        elif sort == 'views':
+            sort_col, sort_key = Post.views, lambda p: p.views
+        else:
+            sort_col, sort_key = Post.created_at, lambda p: p.created_at
+        cursor = None
+        token = request.args.get('cursor', '', type=str)
+        if token:
+            try:
+                cursor = decode_cursor(token)
+            except InvalidCursor:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        if user_id and sort_col is Post.created_at and order == 'desc' and not search and not tag_names:
+            # A user's own history continues into the archive past the hot window
+            match = {'user_id': user_id, 'collapsed': False}
+            if category:
+                match['category'] = category
+            if visibility:
+                match['visibility'] = visibility
+            try:
+                posts, next_cursor = archive_keyset_page(
+                    query, 'post', Post.created_at, Post.id, cursor=cursor, limit=per_page, match=match
+                )
+            except InvalidCursor:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        else:
+            posts, next_cursor = keyset_page(
+                query, sort_col, Post.id, cursor=cursor,
+                descending=order == 'desc', limit=per_page, sort_key=sort_key
+            )
+        record_views([p.id for p in posts])
+        return jsonify({
+            'posts': serialize_posts(posts, fields, include),
+            'next_cursor': next_cursor,
+            'per_page': per_page
+        })
+
     # Sorting
-    if sort == 'likes':
-        sort_col = Post.likes
-    elif sort == 'views':
-        sort_col = Post.views if hasattr(Post, 'views') else Post.created_at
+    if sort == 'relevance' and relevance is not None:
+        query = query.order_by(relevance, Post.id.desc())
     else:
-        sort_col = Post.created_at
-    sort_col = desc(sort_col) if order == 'desc' else asc(sort_col)
-    query = query.order_by(sort_col)
+        if sort == 'likes':
+            sort_col = Post.likes
+        elif sort == 'views':
+            sort_col = Post.views
+        else:
+            sort_col = Post.created_at
+        sort_col = desc(sort_col) if order == 'desc' else asc(sort_col)
+        query = query.order_by(sort_col)
 
     # Pagination
     pagination = query.paginate(page=page, per_page=per_page, error_out=False)
     posts = pagination.items
     total = pagination.total
+    record_views([p.id for p in posts])
 
-    def serialize_post(post):
-        user_profile = Profile.query.filter_by(user_id=post.user_id).first()
-        return {
-            'id': post.id,
-            'content': post.content,
-            'media_url': post.media_url,
-            'created_at': post.created_at.isoformat(),
-            'likes': post.likes,
-            'tags': post.tags.split(',') if post.tags else [],
-            'category': getattr(post, 'category', None),
-            'visibility': getattr(post, 'visibility', None),
-            'user': {
-                'id': post.user.id,
-                'name': post.user.username,
-                'avatar': user_profile.image if user_profile else None,
-                'job_title': user_profile.job_title if user_profile else None
-            },
-            'comments': [
-                {
-                    'id': c.id,
-                    'user_id': c.user_id,
-                    'user_name': c.user.username,
-                    'user_avatar': c.user.profile.image if c.user.profile else None,
-                    'content': c.content,
-                    'created_at': c.created_at.isoformat()
-                } for c in post.comments
-            ]
-        }
     return jsonify({
-        'posts': [serialize_post(p) for p in posts],
+        'posts': serialize_posts(posts, fields, include),
         'total': total,
         'page': page,
         'per_page': per_page
@@ -197,13 +267,38 @@ def list_posts():
 def uploaded_file(filename):
     return current_app.send_static_file(os.path.join(UPLOAD_FOLDER, filename)) 
 
+@posts_bp.route('/posts/<int:post_id>', methods=['GET'])
+def get_post(post_id):
+    try:
+        fields, include = parse_fields_and_include(POST_FIELDS.keys(), POST_INCLUDES)
+    except InvalidFieldset as e:
+        return jsonify({'error': str(e)}), 400
+    post = Post.query.options(load_only(*post_columns(fields, include))).filter_by(id=post_id).first()
+    if post:
+        record_views([post.id])
+    else:
+        post = find_archived('post', post_id)
+    if not post:
+        return jsonify({'error': 'Post not found'}), 404
+    return jsonify(serialize_posts([post], fields, include)[0])
+
 @posts_bp.route('/posts/<int:post_id>/like', methods=['POST'])
 @jwt_required()
 def like_post(post_id):
-    post = Post.query.get_or_404(post_id)
-    post.likes += 1
-    db.session.commit()
-    return jsonify({'likes': post.likes}), 200
+    user_id = int(get_jwt_identity())
+    row = db.session.query(Post.likes, Post.user_id).filter(Post.id == post_id).first()
+    if row is None:
+        return jsonify({'error': 'Not found'}), 404
+    db.session.add(PostLike(user_id=user_id, post_id=post_id))
+    try:
+        db.session.commit()
+        # Counted in memory, written to Post.likes by the next batched flush
+        like_counter.add(post_id)
+        notify(row.user_id, post_id, 'like', user_id)
+    except IntegrityError:
+        # Already liked by this user
+        db.session.rollback()
+    return jsonify({'likes': (row.likes or 0) + like_counter.pending(post_id), 'liked': True}), 200
 
 @posts_bp.route('/posts/<int:post_id>/comments', methods=['POST'])
 @jwt_required()
@@ -213,21 +308,90 @@ def add_comment(post_id):
     content = data.get('content')
     if not content:
         return jsonify({'error': 'Content required'}), 400
-    comment = Comment(post_id=post_id, user_id=user_id, content=content)
+    parent = None
+    parent_id = data.get('parent_id')
+    if parent_id is not None:
+        parent = Comment.query.filter_by(id=parent_id, post_id=post_id).first()
+        if not parent:
+            return jsonify({'error': 'Parent comment not found'}), 404
+        if parent.depth >= MAX_DEPTH:
+            return jsonify({'error': 'Reply thread is too deep'}), 400
+    comment = Comment(post_id=post_id, user_id=user_id, parent_id=parent_id, content=content)
     db.session.add(comment)
+    # The path ends with the comment's own id, so it is set after the insert
+    db.session.flush()
+    comment.assign_path(parent)
+    # Keep the denormalized count in the same transaction as the insert
+    updated = db.session.execute(
+        update(Post).where(Post.id == post_id).values(comment_count=Post.comment_count + 1)
+    ).rowcount
+    if not updated:
+        db.session.rollback()
+        return jsonify({'error': 'Not found'}), 404
     db.session.commit()
-    return jsonify({'message': 'Comment added'}), 201
+    notify(db.session.query(Post.user_id).filter(Post.id == post_id).scalar(), post_id, 'comment', user_id)
+    return jsonify({'message': 'Comment added', 'id': comment.id}), 201
+
+def is_archived(post_id):
+    """Whether `post_id` has left the hot table, taking its comments with it"""
+    return db.session.query(Post.id).filter_by(id=post_id).first() is None
 
 @posts_bp.route('/posts/<int:post_id>/comments', methods=['GET'])
 def get_comments(post_id):
-    comments = Comment.query.filter_by(post_id=post_id).order_by(Comment.created_at.asc()).all()
-    return jsonify([
-        {
-            'id': c.id,
-            'user_id': c.user_id,
-            'user_name': c.user.name,
-            'user_avatar': c.user.profile.image if c.user.profile else None,
-            'content': c.content,
-            'created_at': c.created_at.isoformat()
-        } for c in comments
-    ]) 
\ No newline at end of file
+    """Comments of a post, oldest first; an archived post's come from its month table"""
+    query = Comment.query.filter_by(post_id=post_id)
+    # Threaded mode: the whole reply tree (optionally ?max_depth=) in one range read
+    if request.args.get('threaded', '').lower() in ('1', 'true', 'yes'):
+        max_depth = request.args.get('max_depth', type=int)
+        if max_depth is not None:
+            query = query.filter(Comment.depth <= max_depth)
+        comments = query.order_by(Comment.path).all()
+        if not comments and is_archived(post_id):
+            criteria = [lambda t: t.c.depth <= max_depth] if max_depth is not None else []
+            comments = archived_comments(post_id, *criteria, order_by=('path',))
+        return jsonify(serialize_comment_tree(comments))
+    # Cursor mode: ?cursor= with an empty value starts from the oldest comment
+    if 'cursor' in request.args:
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+        cursor = None
+        token = request.args.get('cursor', '', type=str)
+        if token:
+            try:
+                cursor = decode_cursor(token)
+            except InvalidCursor:
+                return jsonify({'error': 'Invalid cursor'}), 400
+        comments, next_cursor = keyset_page(
+            query, Comment.created_at, Comment.id, cursor=cursor, descending=False, limit=per_page
+        )
+        if not comments and is_archived(post_id):
+            criteria = [lambda t: keyset_filter(t.c.created_at, t.c.id, cursor, descending=False)] if cursor else []
+            comments = archived_comments(post_id, *criteria, limit=per_page + 1)
+            next_cursor = None
+            if len(comments) > per_page:
+                comments = comments[:per_page]
+                next_cursor = encode_cursor(comments[-1].created_at, comments[-1].id)
+        return jsonify({
+            'comments': serialize_comments(comments),
+            'next_cursor': next_cursor,
+            'per_page': per_page
+        })
+    comments = query.order_by(Comment.created_at.asc(), Comment.id.asc()).all()
+    if not comments and is_archived(post_id):
+        comments = archived_comments(post_id)
+    return jsonify(serialize_comments(comments))
+
+@posts_bp.route('/posts/<int:post_id>/comments/<int:comment_id>/replies', methods=['GET'])
+def get_replies(post_id, comment_id):
+    """Reply tree under one comment, ?max_depth= levels deep (default: all)"""
+    root = Comment.query.filter_by(id=comment_id, post_id=post_id).first()
+    if not root:
+        return jsonify({'error': 'Not found'}), 404
+    query = Comment.query.filter(
+        Comment.post_id == post_id,
+        Comment.path > root.path,
+        Comment.path < Comment.subtree_upper_bound(root.path)
+    )
+    max_depth = request.args.get('max_depth', type=int)
+    if max_depth is not None:
+        query = query.filter(Comment.depth <= root.depth + max_depth)
+    return jsonify(serialize_comment_tree(query.order_by(Comment.path).all()))
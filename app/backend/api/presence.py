@@ -0,0 +1,39 @@
+from datetime import datetime
+from flask import Blueprint, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.backend.models.user import User
+from app.backend.services.presence import presence
+
+presence_bp = Blueprint('presence', __name__)
+
+@presence_bp.route('/heartbeat', methods=['POST'])
+@jwt_required()
+def heartbeat():
+    presence.heartbeat(int(get_jwt_identity()))
+    return jsonify({'online': True, 'ttl': presence.ttl})
+
+@presence_bp.route('/online', methods=['POST'])
+@jwt_required()
+def online():
+    """Which of {"user_ids": [...]} are online, with last-seen times
+
+    Offline users' last_seen comes from User.last_seen_at when
+    "include_last_seen" is true, which costs one indexed IN query.
+    """
+    data = request.get_json(silent=True) or {}
+    user_ids = data.get('user_ids')
+    max_batch = current_app.config.get('PRESENCE_MAX_BATCH', 500)
+    if not isinstance(user_ids, list) or not all(isinstance(u, int) for u in user_ids):
+        return jsonify({'error': 'user_ids must be a list of integers'}), 400
+    if len(user_ids) > max_batch:
+        return jsonify({'error': f'At most {max_batch} user_ids per request'}), 400
+    online = presence.online(user_ids)
+    last_seen = {u: datetime.utcfromtimestamp(ts) for u, ts in online.items()}
+    offline = [u for u in dict.fromkeys(user_ids) if u not in online]
+    if data.get('include_last_seen') and offline:
+        rows = User.query.with_entities(User.id, User.last_seen_at).filter(User.id.in_(offline))
+        last_seen.update({row.id: row.last_seen_at for row in rows if row.last_seen_at})
+    return jsonify({
+        'online': sorted(online),
+        'last_seen': {str(u): ts for u, ts in last_seen.items()}
+    })
@@ -4,6 +4,8 @@ from app.backend.models.user import User
 from app.backend.models.profile import Profile
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from markupsafe import escape
+from sqlalchemy.orm import load_only
+from app.backend.api.fieldsets import parse_fields_and_include, InvalidFieldset
 from werkzeug.utils import secure_filename
 from PIL import Image
 import time
@@ -34,6 +36,16 @@ def create_thumbnail(image, thumb_path):
     img.save(thumb_path, optimize=True, quality=70)
     return thumb_path
 
+PROFILE_FIELDS = (
+    'id', 'user_id', 'first_name', 'last_name', 'bio', 'location', 'website', 'skills',
+    'experience', 'education', 'image', 'job_title', 'company', 'social_links'
+)
+OWN_PROFILE_FIELDS = ('id', 'user_id', 'bio', 'location', 'skills', 'experience', 'education', 'image')
+PUBLIC_PROFILE_FIELDS = ('id', 'user_id', 'bio', 'location', 'skills', 'experience', 'education')
+
+def profile_columns(fields):
+    return [getattr(Profile, f) for f in fields] + [Profile.user_id]
+
 def serialize_profile(profile):
     return {
         'id': profile.id,
@@ -56,13 +68,16 @@ def get_profile():
     """Get current user's profile"""
     try:
         user_id = int(get_jwt_identity())
+        fields, include = parse_fields_and_include(PROFILE_FIELDS, ('user',))
+        fields = OWN_PROFILE_FIELDS if fields is None else fields
+        include = ('user',) if include is None else include
         
         # Get user and profile
-        user = User.query.get(user_id)
+        user = User.query.options(load_only(User.id, User.username, User.email)).get(user_id)
         if not user:
             return jsonify({'message': 'User not found'}), 404
         
-        profile = Profile.query.filter_by(user_id=user_id).first()
+        profile = Profile.query.options(load_only(*profile_columns(fields))).filter_by(user_id=user_id).first()
         
         if not profile:
             # Create profile with default names if it doesn't exist
@@ -70,21 +85,16 @@ def get_profile():
             db.session.add(profile)
             db.session.commit()
         
-        return jsonify({
-            'id': profile.id,
-            'user_id': profile.user_id,
-            'bio': profile.bio,
-            'location': profile.location,
-            'skills': profile.skills,
-            'experience': profile.experience,
-            'education': profile.education,
-            'image': profile.image,
-            'user': {
+        data = {f: getattr(profile, f) for f in fields}
+        if 'user' in include:
+            data['user'] = {
                 'username': user.username,
                 'email': user.email
             }
-        }), 200
+        return jsonify(data), 200
         
+    except InvalidFieldset as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         print(f"Profile get error: {str(e)}")
         db.session.rollback()
@@ -155,28 +165,29 @@ def update_profile():
 def get_user_profile(user_id):
     """Get a specific user's public profile"""
     try:
-        user = User.query.get(user_id)
+        # Only public fields may be requested here
+        fields, include = parse_fields_and_include(PUBLIC_PROFILE_FIELDS, ('user',))
+        fields = PUBLIC_PROFILE_FIELDS if fields is None else fields
+        include = ('user',) if include is None else include
+
+        user = User.query.options(load_only(User.id, User.username)).get(user_id)
         if not user:
             return jsonify({'message': 'User not found'}), 404
         
-        profile = Profile.query.filter_by(user_id=user_id).first()
+        profile = Profile.query.options(load_only(*profile_columns(fields))).filter_by(user_id=user_id).first()
         
         if not profile:
             return jsonify({'message': 'Profile not found'}), 404
         
-        return jsonify({
-            'id': profile.id,
-            'user_id': profile.user_id,
-            'bio': profile.bio,
-            'location': profile.location,
-            'skills': profile.skills,
-            'experience': profile.experience,
-            'education': profile.education,
-            'user': {
+        data = {f: getattr(profile, f) for f in fields}
+        if 'user' in include:
+            data['user'] = {
                 'username': user.username
             }
-        }), 200
+        return jsonify(data), 200
         
+    except InvalidFieldset as e:
+        return jsonify({'message': str(e)}), 400
     except Exception as e:
         print(f"Public profile get error: {str(e)}")
         return jsonify({'message': 'Internal server error'}), 500
@@ -0,0 +1,70 @@
+from flask import Blueprint, Response, request, jsonify, current_app
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.backend.services.push import hub
+from app.backend.services.serialization import dumps
+
+push_bp = Blueprint('push', __name__)
+
+# EventSource cannot set headers, so streams also accept ?jwt=<token>. The
+# gunicorn configs log request paths without query strings to keep it out of logs.
+TOKEN_LOCATIONS = ['headers', 'query_string']
+
+def format_event(event):
+    return f"id: {event['id']}\nevent: {event['type']}\ndata: {dumps(event['data']).decode()}\n\n"
+
+@push_bp.route('/stream', methods=['GET'])
+@jwt_required(locations=TOKEN_LOCATIONS)
+def stream():
+    """Server-Sent Events stream of the current user's messages and notifications"""
+    user_id = int(get_jwt_identity())
+    heartbeat = current_app.config.get('PUSH_HEARTBEAT', 15)
+    last_id = request.headers.get('Last-Event-ID', type=int)
+    if last_id is None:
+        last_id = request.args.get('after', type=int)
+
+    def events(last_id):
+        subscription = hub.subscribe(user_id)
+        try:
+            if last_id is not None:
+                for event in hub.replay(user_id, last_id):
+                    last_id = event['id']
+                    yield format_event(event)
+            yield ': connected\n\n'
+            while True:
+                event = subscription.get(heartbeat)
+                if event is None:
+                    # Keeps proxies from closing an idle connection
+                    yield ': keepalive\n\n'
+                elif last_id is None or event['id'] > last_id:
+                    last_id = event['id']
+                    yield format_event(event)
+        finally:
+            hub.unsubscribe(subscription)
+
+    return Response(events(last_id), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@push_bp.route('/poll', methods=['GET'])
+@jwt_required(locations=TOKEN_LOCATIONS)
+def poll():
+    """Long-polling fallback: events after ?after=, waiting up to ?timeout= seconds for one"""
+    user_id = int(get_jwt_identity())
+    after = request.args.get('after', type=int)
+    max_timeout = current_app.config.get('PUSH_POLL_TIMEOUT', 25)
+    timeout = min(max(request.args.get('timeout', max_timeout, type=float), 0), max_timeout)
+    subscription = hub.subscribe(user_id)
+    try:
+        events = hub.replay(user_id, after) if after is not None else []
+        if not events:
+            event = subscription.get(timeout)
+            events = [event] + subscription.drain() if event else []
+        if after is not None:
+            events = [e for e in events if e['id'] > after]
+    finally:
+        hub.unsubscribe(subscription)
+    return jsonify({
+        'events': events,
+        'last_event_id': events[-1]['id'] if events else after
+    })
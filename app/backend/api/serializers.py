@@ -0,0 +1,184 @@
+from flask import current_app
+from sqlalchemy import func
+from sqlalchemy.orm import load_only
+from app.backend.extensions import db
+from app.backend.models.user import User
+from app.backend.models.post import Post
+from app.backend.models.profile import Profile
+from app.backend.models.comment import Comment
+from app.backend.services.likes import pending_likes
+from app.backend.services.archive import load_archived_comments
+
+
+def load_users_and_profiles(user_ids):
+    """Fetch users and their profiles for a set of ids in two queries."""
+    user_ids = set(user_ids)
+    if not user_ids:
+        return {}, {}
+    users = {u.id: u for u in User.query.options(load_only(User.id, User.username)).filter(User.id.in_(user_ids))}
+    profiles = {}
+    # Lowest profile id wins, matching Profile.query.filter_by(...).first()
+    query = Profile.query.options(load_only(Profile.id, Profile.user_id, Profile.image, Profile.job_title))
+    for profile in query.filter(Profile.user_id.in_(user_ids)).order_by(Profile.id.desc()):
+        profiles[profile.user_id] = profile
+    return users, profiles
+
+
+def load_comments(post_ids, limit=None):
+    """Fetch comments for a set of posts in one query, grouped by post id.
+
+    With `limit`, only the newest `limit` comments of each post are read,
+    using a per-post ROW_NUMBER() window, and returned oldest first.
+    """
+    comments = {post_id: [] for post_id in post_ids}
+    if not comments:
+        return comments
+    if limit is None:
+        query = Comment.query.filter(Comment.post_id.in_(comments.keys())).order_by(Comment.created_at.asc(), Comment.id.asc())
+    else:
+        newest = db.session.query(
+            Comment.id.label('id'),
+            func.row_number().over(
+                partition_by=Comment.post_id,
+                order_by=(Comment.created_at.desc(), Comment.id.desc())
+            ).label('position')
+        ).filter(Comment.post_id.in_(comments.keys())).subquery()
+        query = Comment.query.join(newest, newest.c.id == Comment.id).filter(
+            newest.c.position <= limit
+        ).order_by(Comment.created_at.asc(), Comment.id.asc())
+    for comment in query:
+        comments[comment.post_id].append(comment)
+    return comments
+
+
+def serialize_comment(comment, users, profiles):
+    user = users.get(comment.user_id)
+    profile = profiles.get(comment.user_id)
+    return {
+        'id': comment.id,
+        'parent_id': comment.parent_id,
+        'user_id': comment.user_id,
+        'user_name': user.username if user else None,
+        'user_avatar': profile.image if profile else None,
+        'content': comment.content,
+        'created_at': comment.created_at
+    }
+
+
+# Scalar post fields: the columns each one needs and how it is rendered
+POST_FIELDS = {
+    'id': ((Post.id,), lambda p, likes: p.id),
+    'content': ((Post.content,), lambda p, likes: p.content),
+    'media_url': ((Post.media_url,), lambda p, likes: p.media_url),
+    'created_at': ((Post.created_at,), lambda p, likes: p.created_at),
+    'likes': ((Post.likes,), lambda p, likes: (p.likes or 0) + likes),
+    'comment_count': ((Post.comment_count,), lambda p, likes: p.comment_count or 0),
+    'views': ((Post.views,), lambda p, likes: p.views or 0),
+    'unique_viewers': ((Post.unique_viewers,), lambda p, likes: p.unique_viewers or 0),
+    'tags': ((Post.tags,), lambda p, likes: p.tags.split(',') if p.tags else []),
+    'category': ((Post.category,), lambda p, likes: p.category),
+    'visibility': ((Post.visibility,), lambda p, likes: p.visibility),
+}
+# Relationships, each costing extra batched queries when included
+POST_INCLUDES = ('user', 'comments')
+
+
+def post_columns(fields=None, include=None):
+    """Post columns needed to render `fields` and `include`, for load_only()."""
+    fields = POST_FIELDS.keys() if fields is None else fields
+    columns = [Post.id]
+    for field in fields:
+        columns.extend(POST_FIELDS[field][0])
+    if include is None or 'user' in include:
+        columns.append(Post.user_id)
+    return columns
+
+
+def serialize_post(post, users, profiles, comments, pending_like_count=0, fields=None, include=None):
+    fields = POST_FIELDS.keys() if fields is None else fields
+    include = POST_INCLUDES if include is None else include
+    data = {field: POST_FIELDS[field][1](post, pending_like_count) for field in fields}
+    if 'user' in include:
+        user = users.get(post.user_id)
+        profile = profiles.get(post.user_id)
+        data['user'] = {
+            'id': post.user_id,
+            'name': user.username if user else None,
+            'avatar': profile.image if profile else None,
+            'job_title': profile.job_title if profile else None
+        }
+    if 'comments' in include:
+        data['comments'] = [serialize_comment(c, users, profiles) for c in comments]
+    return data
+
+
+def serialize_comments(comments):
+    """Serialize a list of comments with their authors loaded in two queries."""
+    users, profiles = load_users_and_profiles(c.user_id for c in comments)
+    return [serialize_comment(c, users, profiles) for c in comments]
+
+
+def serialize_comment_tree(comments):
+    """Nest comments sorted by path into reply trees in one pass.
+
+    Path order puts every parent before its replies, so each comment's
+    parent node already exists when it is reached. Comments whose parent is
+    not in the list (the root of a subtree) become top-level nodes.
+    """
+    users, profiles = load_users_and_profiles(c.user_id for c in comments)
+    nodes = {}
+    roots = []
+    for comment in comments:
+        node = serialize_comment(comment, users, profiles)
+        node['depth'] = comment.depth
+        node['replies'] = []
+        nodes[comment.id] = node
+        parent = nodes.get(comment.parent_id)
+        (parent['replies'] if parent else roots).append(node)
+    return roots
+
+
+def serialize_message(message):
+    return {
+        'id': message.id,
+        'conversation_id': message.conversation_id,
+        'sender_id': message.sender_id,
+        'receiver_id': message.receiver_id,
+        'content': message.content,
+        'sent_at': message.sent_at
+    }
+
+
+def serialize_posts(posts, fields=None, include=None):
+    """Serialize a page of posts with a fixed number of queries.
+
+    Comments, authors, commenters and their profiles are loaded in
+    id-batched lookups instead of lazily per post, so the cost does not
+    grow with the number of posts or comments on the page. Only the newest
+    COMMENT_PREVIEW_SIZE comments of each post are embedded; the full
+    thread is paginated through GET /posts/posts/<id>/comments.
+
+    `fields` and `include` restrict the output (None means everything);
+    relationships that are not included are never queried.
+    """
+    posts = list(posts)
+    fields = POST_FIELDS.keys() if fields is None else fields
+    include = POST_INCLUDES if include is None else include
+    comments = {p.id: [] for p in posts}
+    if 'comments' in include:
+        limit = current_app.config.get('COMMENT_PREVIEW_SIZE', 3)
+        comments = load_comments(comments.keys(), limit=limit)
+        archived = [p for p in posts if getattr(p, 'archive_month', None)]
+        if archived:
+            comments.update(load_archived_comments(archived, limit=limit))
+    user_ids = set()
+    if 'user' in include:
+        user_ids.update(p.user_id for p in posts)
+    for post_comments in comments.values():
+        user_ids.update(c.user_id for c in post_comments)
+    users, profiles = load_users_and_profiles(user_ids)
+    pending = pending_likes([p.id for p in posts]) if 'likes' in fields else {}
+    return [
+        serialize_post(p, users, profiles, comments[p.id], pending.get(p.id, 0), fields, include)
+        for p in posts
+    ]
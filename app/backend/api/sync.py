@@ -0,0 +1,71 @@
+from flask import Blueprint, request, jsonify
+from flask_jwt_extended import jwt_required, get_jwt_identity
+from app.backend.models.post import Post
+from app.backend.models.comment import Comment
+from app.backend.models.message import Message
+from app.backend.api.pagination import encode_cursor, decode_cursor, InvalidCursor
+from app.backend.api.serializers import serialize_posts, serialize_comments, serialize_message
+from app.backend.services.changes import head, horizon, changes_since, latest_ops
+
+sync_bp = Blueprint('sync', __name__)
+
+SYNC_TYPES = {'post': 'posts', 'comment': 'comments', 'like': 'likes', 'message': 'messages'}
+
+def empty_delta(next_cursor):
+    delta = {name: [] for name in SYNC_TYPES.values()}
+    delta['deleted'] = {name: [] for name in SYNC_TYPES.values()}
+    delta.update({'next_cursor': next_cursor, 'has_more': False})
+    return delta
+
+@sync_bp.route('/', methods=['GET'])
+@jwt_required()
+def sync():
+    """Posts, comments, likes and messages changed since ?cursor=
+
+    Without a cursor only the current cursor is returned: clients load
+    their initial state from the regular endpoints, then poll from there.
+    Each entity appears once per response in its latest state; deletions
+    are listed under 'deleted'. A cursor older than the retained change log
+    gets 410 with a fresh cursor: the client reloads its state from the
+    regular endpoints, then polls from that cursor.
+    """
+    user_id = int(get_jwt_identity())
+    limit = min(max(request.args.get('limit', 500, type=int), 1), 1000)
+    token = request.args.get('cursor', '', type=str)
+    if not token:
+        current = head()
+        return jsonify(empty_delta(encode_cursor(current, current)))
+    try:
+        after_id = decode_cursor(token)[1]
+    except InvalidCursor:
+        return jsonify({'error': 'Invalid cursor'}), 400
+    if after_id < horizon():
+        current = head()
+        return jsonify({'error': 'Cursor expired', 'resync': True, 'next_cursor': encode_cursor(current, current)}), 410
+
+    changes = changes_since(user_id, after_id, limit + 1)
+    has_more = len(changes) > limit
+    changes = changes[:limit]
+    if not changes:
+        return jsonify(empty_delta(token))
+
+    latest = latest_ops(changes)
+    upserted = {t: [k for k, op in latest.get(t, {}).items() if op == 'upsert'] for t in SYNC_TYPES}
+    # Rows deleted after their logged upsert are simply missing here; their tombstone follows
+    posts = Post.query.filter(Post.id.in_(upserted['post']), Post.collapsed.is_(False)).all() if upserted['post'] else []
+    comments = Comment.query.filter(Comment.id.in_(upserted['comment'])).order_by(Comment.path).all() if upserted['comment'] else []
+    messages = Message.query.filter(Message.id.in_(upserted['message'])).order_by(Message.id).all() if upserted['message'] else []
+
+    delta = empty_delta(encode_cursor(changes[-1].id, changes[-1].id))
+    delta.update({
+        'posts': serialize_posts(posts),
+        'comments': serialize_comments(comments),
+        'likes': [{'post_id': post_id, 'user_id': liker_id} for post_id, liker_id in upserted['like']],
+        'messages': [serialize_message(m) for m in messages],
+        'has_more': has_more
+    })
+    for entity_type, name in SYNC_TYPES.items():
+        for key, op in latest.get(entity_type, {}).items():
+            if op == 'delete':
+                delta['deleted'][name].append({'post_id': key[0], 'user_id': key[1]} if entity_type == 'like' else key)
+    return jsonify(delta)
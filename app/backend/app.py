@@ -1,12 +1,20 @@
 from flask import Flask, jsonify, send_from_directory, request
 from app.backend.config import Config
-from app.backend.extensions import db, migrate, jwt
-from app.backend.api import auth_bp, profile_bp, posts_bp, feed_bp, jobs_bp, messaging_bp
+from app.backend.extensions import db, migrate, jwt, cache
+from app.backend.api import auth_bp, profile_bp, posts_bp, feed_bp, jobs_bp, messaging_bp, export_bp, connections_bp, sync_bp, notifications_bp, push_bp, presence_bp, health_bp
 from flask_cors import CORS
 from flask_limiter import Limiter
 from flask_limiter.util import get_remote_address
 import os
 from app.backend.models.profile import Profile
+from app.backend.services import search, likes, trending, views, notifications, push, presence, jobs, duplicates, timeline
+from app.backend.services.serialization import FastJSONProvider
+from app.backend.services.export import export_user_command
+from app.backend.services.connections import compute_suggestions_command
+from app.backend.services.trending import rebuild_trending_command
+from app.backend.services.duplicates import index_simhash_command
+from app.backend.services.archive import archive_cold_command
+from app.backend.services.changes import prune_change_log_command
 
 # Set a high rate limit for development. Adjust for production as needed.
 limiter = Limiter(key_func=get_remote_address, default_limits=["5000 per day", "1000 per hour"])
@@ -24,11 +32,23 @@ def ip_whitelist():
 def create_app():
     app = Flask(__name__)
     app.config.from_object(Config)
+    app.json = FastJSONProvider(app)
 
     # Initialize extensions
     db.init_app(app)
     migrate.init_app(app, db)
     jwt.init_app(app)
+    cache.init_app(app)
+    search.init_app(app)
+    likes.init_app(app)
+    trending.init_app(app)
+    views.init_app(app)
+    notifications.init_app(app)
+    push.init_app(app)
+    presence.init_app(app)
+    jobs.init_app(app)
+    duplicates.init_app(app)
+    timeline.init_app(app)
     
     # CORS configuration with explicit allowed origins
     CORS(
@@ -60,7 +80,14 @@ def create_app():
                 'posts': '/posts',
                 'feed': '/feed',
                 'jobs': '/jobs',
-                'messaging': '/messaging'
+                'messaging': '/messaging',
+                'export': '/export',
+                'connections': '/connections',
+                'sync': '/sync',
+                'notifications': '/notifications',
+                'push': '/push',
+                'presence': '/presence',
+                'health': '/health'
             }
         })
 
@@ -80,6 +107,21 @@ def create_app():
     app.register_blueprint(feed_bp, url_prefix='/feed')
     app.register_blueprint(jobs_bp, url_prefix='/jobs')
     app.register_blueprint(messaging_bp, url_prefix='/messaging')
+    app.register_blueprint(export_bp, url_prefix='/export')
+    app.register_blueprint(connections_bp, url_prefix='/connections')
+    app.register_blueprint(sync_bp, url_prefix='/sync')
+    app.register_blueprint(notifications_bp, url_prefix='/notifications')
+    app.register_blueprint(push_bp, url_prefix='/push')
+    app.register_blueprint(presence_bp, url_prefix='/presence')
+    app.register_blueprint(health_bp, url_prefix='/health')
+
+    # CLI commands
+    app.cli.add_command(export_user_command)
+    app.cli.add_command(compute_suggestions_command)
+    app.cli.add_command(rebuild_trending_command)
+    app.cli.add_command(index_simhash_command)
+    app.cli.add_command(archive_cold_command)
+    app.cli.add_command(prune_change_log_command)
 
     # Error handler to ensure CORS headers are added to error responses
     @app.errorhandler(500)
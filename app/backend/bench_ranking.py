@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Benchmark feed ranking on synthetic candidates.
+
+Reports the vectorized scoring pass (services.ranking.rank) and the Python
+feature extraction that feeds it, for 10k candidates by default.
+
+Usage: python -m app.backend.bench_ranking [--candidates 10000] [--rounds 50]
+"""
+
+import argparse
+import random
+import timeit
+from datetime import datetime, timedelta
+
+from app.backend.services import ranking
+
+TAGS = ['python', 'flask', 'react', 'java', 'career', 'design', 'devops', 'data', 'ml', 'rust']
+
+
+def make_rows(n, authors=500):
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    return [
+        (
+            i,
+            rng.randrange(authors),
+            now - timedelta(minutes=rng.randrange(60 * 24 * 14)),
+            rng.randrange(500),
+            rng.randrange(80),
+            ','.join(rng.sample(TAGS, rng.randrange(4))),
+        )
+        for i in range(n)
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--candidates', type=int, default=10000)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    rows = make_rows(args.candidates)
+    skills = {'python', 'data', 'ml'}
+    affinity = {author: author % 7 for author in range(0, 500, 3)}
+    features = ranking.extract_features(rows, skills, affinity)
+
+    print(f"numpy: {'yes' if ranking.np is not None else 'no (chronological fallback)'}")
+    print(f"{args.candidates} candidates, {args.rounds} rounds")
+    cases = [
+        ('feature extraction', lambda: ranking.extract_features(rows, skills, affinity)),
+        ('rank (score + sort)', lambda: ranking.rank(features)),
+    ]
+    for name, fn in cases:
+        best = min(timeit.repeat(fn, number=args.rounds, repeat=3)) / args.rounds
+        print(f"  {name:<22} {best * 1e3:8.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark response encoding for a /posts/ page of 100 posts.
+
+Compares Flask's default jsonify path (stdlib json, datetimes converted
+with isoformat() by hand) with FastJSONProvider (orjson) and MessagePack.
+
+Usage: python -m app.backend.bench_serialization [--posts 100] [--rounds 500]
+"""
+
+import argparse
+import timeit
+from datetime import datetime, timedelta
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.backend.services import serialization
+from app.backend.services.serialization import FastJSONProvider
+
+
+def make_page(n_posts, n_comments=3):
+    now = datetime.utcnow()
+    posts = []
+    for i in range(n_posts):
+        posts.append({
+            'id': i,
+            'content': 'Lorem ipsum dolor sit amet, consectetur adipiscing elit. ' * 4,
+            'media_url': f'https://example.com/uploads/{i}.jpg',
+            'created_at': now - timedelta(minutes=i),
+            'likes': i * 3,
+            'comment_count': n_comments,
+            'tags': ['python', 'flask', 'career'],
+            'category': 'engineering',
+            'visibility': 'public',
+            'user': {'id': i % 17, 'name': f'user{i % 17}', 'avatar': None, 'job_title': 'Engineer'},
+            'comments': [
+                {
+                    'id': i * 10 + j,
+                    'user_id': j,
+                    'user_name': f'user{j}',
+                    'user_avatar': None,
+                    'content': 'Nice post!',
+                    'created_at': now - timedelta(minutes=i, seconds=j),
+                } for j in range(n_comments)
+            ],
+        })
+    return {'posts': posts, 'total': n_posts * 10, 'page': 1, 'per_page': n_posts}
+
+
+def with_isoformat(page):
+    """What the endpoints did before: isoformat() every datetime by hand."""
+    posts = []
+    for p in page['posts']:
+        p = dict(p, created_at=p['created_at'].isoformat())
+        p['comments'] = [dict(c, created_at=c['created_at'].isoformat()) for c in p['comments']]
+        posts.append(p)
+    return dict(page, posts=posts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--posts', type=int, default=100)
+    parser.add_argument('--rounds', type=int, default=500)
+    args = parser.parse_args()
+
+    page = make_page(args.posts)
+    default_app = Flask('default')
+    default_app.json = DefaultJSONProvider(default_app)
+    fast_app = Flask('fast')
+    fast_app.json = FastJSONProvider(fast_app)
+
+    cases = [
+        ('jsonify (stdlib, isoformat by hand)', default_app, lambda: default_app.json.response(with_isoformat(page)).get_data()),
+        ('FastJSONProvider JSON', fast_app, lambda: fast_app.json.response(page).get_data()),
+    ]
+    if serialization.msgpack is not None:
+        cases.append(('MessagePack', fast_app, lambda: serialization.packb(page)))
+
+    print(f"orjson: {'yes' if serialization.orjson else 'no (stdlib fallback)'}, "
+          f"msgpack: {'yes' if serialization.msgpack else 'no'}")
+    print(f"{args.posts} posts, {args.rounds} rounds")
+    baseline = None
+    for name, app, fn in cases:
+        with app.app_context():
+            size = len(fn())
+            best = min(timeit.repeat(fn, number=args.rounds, repeat=3)) / args.rounds
+        baseline = baseline or best
+        print(f"  {name:<38} {best * 1e6:9.1f} us/page  {size:7d} bytes  {baseline / best:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,5 +25,107 @@ class Config:
     JWT_SECRET_KEY = os.environ.get('JWT_SECRET_KEY', 'jwt-secret-key')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     
+    # Cache shared by workers: memory (per process), sqlite (per host) or redis
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'memory')
+    CACHE_URL = os.environ.get('CACHE_URL')
+    CACHE_DEFAULT_TTL = int(os.environ.get('CACHE_DEFAULT_TTL', 300))
+    
+    # Users allowed to read operational endpoints such as GET /health/cache (comma-separated ids)
+    ADMIN_USER_IDS = {int(i) for i in os.environ.get('ADMIN_USER_IDS', '').split(',') if i.strip()}
+    
+    # Likes are counted in memory and written in batches
+    LIKE_FLUSH_INTERVAL = float(os.environ.get('LIKE_FLUSH_INTERVAL', 2.0))
+    LIKE_FLUSH_THRESHOLD = int(os.environ.get('LIKE_FLUSH_THRESHOLD', 100))
+    
+    # Buffered post view counts and HyperLogLog unique viewers (services/views.py)
+    VIEW_FLUSH_INTERVAL = float(os.environ.get('VIEW_FLUSH_INTERVAL', 5.0))
+    VIEW_FLUSH_THRESHOLD = int(os.environ.get('VIEW_FLUSH_THRESHOLD', 1000))
+    VIEW_HLL_PRECISION = int(os.environ.get('VIEW_HLL_PRECISION', 10))
+    
+    # Near-duplicate posts (services/duplicates.py): off, reject, flag or collapse
+    DUPLICATE_MODE = os.environ.get('DUPLICATE_MODE', 'flag')
+    DUPLICATE_HAMMING_THRESHOLD = int(os.environ.get('DUPLICATE_HAMMING_THRESHOLD', 3))
+    # 3 to 64 and above the threshold; each band of the 64-bit fingerprint must fit a signed 32-bit bucket
+    DUPLICATE_BANDS = int(os.environ.get('DUPLICATE_BANDS', 4))
+    DUPLICATE_MIN_TOKENS = int(os.environ.get('DUPLICATE_MIN_TOKENS', 5))
+    DUPLICATE_MAX_CANDIDATES = int(os.environ.get('DUPLICATE_MAX_CANDIDATES', 500))
+    
+    # Like and comment notifications, coalesced per post within NOTIFICATION_WINDOW seconds
+    NOTIFICATION_WINDOW = int(os.environ.get('NOTIFICATION_WINDOW', 3600))
+    NOTIFICATION_FLUSH_INTERVAL = float(os.environ.get('NOTIFICATION_FLUSH_INTERVAL', 5.0))
+    NOTIFICATION_FLUSH_THRESHOLD = int(os.environ.get('NOTIFICATION_FLUSH_THRESHOLD', 500))
+    
+    # Real-time push (services/push.py): memory, sqlite or redis bus
+    PUSH_BACKEND = os.environ.get('PUSH_BACKEND', 'memory')
+    PUSH_URL = os.environ.get('PUSH_URL')
+    PUSH_POLL_INTERVAL = float(os.environ.get('PUSH_POLL_INTERVAL', 0.2))
+    PUSH_HEARTBEAT = float(os.environ.get('PUSH_HEARTBEAT', 15))
+    PUSH_POLL_TIMEOUT = float(os.environ.get('PUSH_POLL_TIMEOUT', 25))
+    PUSH_REPLAY_SIZE = int(os.environ.get('PUSH_REPLAY_SIZE', 50))
+    PUSH_REPLAY_SECONDS = int(os.environ.get('PUSH_REPLAY_SECONDS', 60))
+    PUSH_QUEUE_SIZE = int(os.environ.get('PUSH_QUEUE_SIZE', 100))
+    
+    # Online presence (services/presence.py): sqlite, redis or (single process only) memory store
+    PRESENCE_BACKEND = os.environ.get('PRESENCE_BACKEND', 'sqlite')
+    PRESENCE_URL = os.environ.get('PRESENCE_URL')
+    PRESENCE_TTL = int(os.environ.get('PRESENCE_TTL', 60))
+    PRESENCE_PERSIST_INTERVAL = int(os.environ.get('PRESENCE_PERSIST_INTERVAL', 300))
+    PRESENCE_MAX_BATCH = int(os.environ.get('PRESENCE_MAX_BATCH', 500))
+    
+    # Cold rows moved to per-month archive tables by `flask archive-cold`
+    ARCHIVE_POST_AFTER_DAYS = int(os.environ.get('ARCHIVE_POST_AFTER_DAYS', 365))
+    ARCHIVE_MESSAGE_AFTER_DAYS = int(os.environ.get('ARCHIVE_MESSAGE_AFTER_DAYS', 180))
+    ARCHIVE_BATCH_SIZE = int(os.environ.get('ARCHIVE_BATCH_SIZE', 500))
+    ARCHIVE_BATCH_PAUSE = float(os.environ.get('ARCHIVE_BATCH_PAUSE', 0.2))
+    
+    # GET /jobs/ facet counts: values returned per facet and cache lifetime
+    JOB_FACET_LIMIT = int(os.environ.get('JOB_FACET_LIMIT', 20))
+    JOB_FACET_TTL = int(os.environ.get('JOB_FACET_TTL', 300))
+    
+    # GET /sync: changes younger than this are held back until concurrent commits settle
+    SYNC_SETTLE_SECONDS = float(os.environ.get('SYNC_SETTLE_SECONDS', 2.0))
+    # Changes kept for incremental sync by `flask prune-change-log`; older cursors must resync
+    SYNC_RETENTION_DAYS = int(os.environ.get('SYNC_RETENTION_DAYS', 30))
+    
+    # Newest comments embedded per post in listings
+    COMMENT_PREVIEW_SIZE = int(os.environ.get('COMMENT_PREVIEW_SIZE', 3))
+    
+    # Home timelines: fan-out on write up to FEED_FANOUT_THRESHOLD recipients
+    FEED_TIMELINE_MAX_LENGTH = int(os.environ.get('FEED_TIMELINE_MAX_LENGTH', 800))
+    # A per-process cache cannot see other workers' invalidations, so keep its copies short-lived
+    FEED_TIMELINE_TTL = int(os.environ.get('FEED_TIMELINE_TTL', 60 if CACHE_BACKEND == 'memory' else 86400))
+    FEED_FANOUT_THRESHOLD = int(os.environ.get('FEED_FANOUT_THRESHOLD', 5000))
+    FEED_PULL_AUTHORS_TTL = int(os.environ.get('FEED_PULL_AUTHORS_TTL', 60))
+    
+    # Ranked feed (GET /feed/?sort=ranked); weights are documented in services/ranking.py
+    FEED_RANK_WEIGHTS = {
+        'recency': float(os.environ.get('FEED_RANK_WEIGHT_RECENCY', 1.0)),
+        'likes': float(os.environ.get('FEED_RANK_WEIGHT_LIKES', 0.3)),
+        'comments': float(os.environ.get('FEED_RANK_WEIGHT_COMMENTS', 0.4)),
+        'affinity': float(os.environ.get('FEED_RANK_WEIGHT_AFFINITY', 0.8)),
+        'tags': float(os.environ.get('FEED_RANK_WEIGHT_TAGS', 0.5)),
+    }
+    FEED_RANK_HALF_LIFE_HOURS = float(os.environ.get('FEED_RANK_HALF_LIFE_HOURS', 24.0))
+    FEED_RANK_CANDIDATES = int(os.environ.get('FEED_RANK_CANDIDATES', 2000))
+    FEED_RANK_TTL = int(os.environ.get('FEED_RANK_TTL', 120))
+    
+    # Bloom filter of post ids already served in the feed (services/seen.py)
+    FEED_SEEN_FILTER = os.environ.get('FEED_SEEN_FILTER', 'true').lower() == 'true'
+    FEED_SEEN_WINDOW = int(os.environ.get('FEED_SEEN_WINDOW', 86400))
+    FEED_SEEN_BITS = int(os.environ.get('FEED_SEEN_BITS', 16384))
+    FEED_SEEN_HASHES = int(os.environ.get('FEED_SEEN_HASHES', 4))
+    
+    # Trending tags (services/trending.py): window name -> half-life in seconds
+    TRENDING_WINDOWS = {
+        '1h': int(os.environ.get('TRENDING_HALF_LIFE_1H', 3600)),
+        '24h': int(os.environ.get('TRENDING_HALF_LIFE_24H', 86400)),
+        '7d': int(os.environ.get('TRENDING_HALF_LIFE_7D', 604800)),
+    }
+    TRENDING_TOP_K = int(os.environ.get('TRENDING_TOP_K', 20))
+    TRENDING_SKETCH_WIDTH = int(os.environ.get('TRENDING_SKETCH_WIDTH', 2048))
+    TRENDING_SKETCH_DEPTH = int(os.environ.get('TRENDING_SKETCH_DEPTH', 4))
+    TRENDING_SNAPSHOT_INTERVAL = float(os.environ.get('TRENDING_SNAPSHOT_INTERVAL', 30.0))
+    TRENDING_FLUSH_THRESHOLD = int(os.environ.get('TRENDING_FLUSH_THRESHOLD', 1000))
+    
     # CORS
     CORS_HEADERS = 'Content-Type' 
\ No newline at end of file
@@ -14,8 +14,18 @@ from app.backend.extensions import db
 from app.backend.models.user import User
 from app.backend.models.profile import Profile
 from app.backend.models.post import Post
+from app.backend.models.tag import Tag
+from app.backend.models.post_like import PostLike
+from app.backend.models.timeline import TimelineEntry, PullAuthor
+from app.backend.models.connection import Connection, ConnectionSuggestion
+from app.backend.models.trending import TrendingSnapshot
+from app.backend.models.simhash import SimhashBand
+from app.backend.models.change_log import ChangeLog
+from app.backend.models.notification import Notification
+from app.backend.models.conversation import Conversation
+from app.backend.models.archive import ArchivePartition
 from app.backend.models.comment import Comment
-from app.backend.models.job import Job
+from app.backend.models.job import Job, JobFacetCount
 from app.backend.models.message import Message
 
 def main():
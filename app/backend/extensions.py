@@ -1,7 +1,9 @@
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
+from app.backend.services.cache import Cache
  
 db = SQLAlchemy()
 migrate = Migrate()
-jwt = JWTManager() 
\ No newline at end of file
+jwt = JWTManager()
+cache = Cache() 
\ No newline at end of file
@@ -9,7 +9,7 @@ backlog = 2048
 
 # Worker processes
 workers = 2
-worker_class = "sync"
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "sync")
 worker_connections = 1000
 timeout = 30
 keepalive = 2
@@ -20,6 +20,9 @@ max_requests_jitter = 50
 
 # Logging
 accesslog = "-"
+# The default format with the path (%(U)s) in place of the full request line:
+# /push streams take the access token as ?jwt=, which must not reach the logs
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
 errorlog = "-"
 loglevel = "info"
 
@@ -0,0 +1,37 @@
+"""
+Gunicorn configuration for the push server (GET /push/stream and /push/poll)
+
+Streams stay open for minutes, so they are served by gevent workers that
+hold thousands of idle connections each, separately from the sync API
+workers:
+
+    gunicorn -c gunicorn.push.conf.py main:app
+
+With more than one process (here or next to the API workers) set
+PUSH_BACKEND to sqlite (one host) or redis so published events reach
+every process.
+"""
+import os
+
+# Server socket
+bind = os.environ.get("PUSH_BIND", "0.0.0.0:10001")
+backlog = 2048
+
+# Worker processes
+workers = int(os.environ.get("PUSH_WORKERS", 1))
+worker_class = "gevent"
+worker_connections = int(os.environ.get("PUSH_WORKER_CONNECTIONS", 5000))
+# Streams send a keepalive every PUSH_HEARTBEAT seconds; this only bounds a stuck worker
+timeout = 120
+keepalive = 75
+
+# Logging
+accesslog = "-"
+# The default format with the path (%(U)s) in place of the full request line:
+# /push streams take the access token as ?jwt=, which must not reach the logs
+access_log_format = '%(h)s %(l)s %(u)s %(t)s "%(m)s %(U)s %(H)s" %(s)s %(b)s "%(f)s" "%(a)s"'
+errorlog = "-"
+loglevel = "info"
+
+# Process naming
+proc_name = "zara-push"
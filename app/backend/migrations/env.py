@@ -51,6 +51,31 @@ def get_metadata():
     return target_db.metadata
 
 
+# Full-text search structures created outside the models by services/search.py
+# and services/jobs.py: the SQLite FTS5 tables and their shadow tables, the
+# MySQL FULLTEXT indexes and the PostgreSQL generated tsvector columns with
+# their GIN indexes
+SEARCH_TABLE_PREFIXES = ('post_fts', 'job_fts')
+SEARCH_INDEXES = {
+    'ix_post_content_fulltext', 'ix_post_search_vector',
+    'ix_job_title_description_fulltext', 'ix_job_search_vector',
+}
+SEARCH_COLUMNS = {'search_vector'}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    if not reflected or compare_to is not None:
+        return True
+    if type_ == 'table':
+        # Per-month archive tables are created at runtime by services/archive.py
+        return not (name.startswith(SEARCH_TABLE_PREFIXES) or '_archive_' in name)
+    if type_ == 'index':
+        return name not in SEARCH_INDEXES
+    if type_ == 'column':
+        return name not in SEARCH_COLUMNS
+    return True
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -93,6 +118,7 @@ def run_migrations_online():
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
@@ -0,0 +1,45 @@
+"""Add full-text search index for post content
+
+Revision ID: 3c5e9a1f7b20
+Revises: 8ae0813124a4
+Create Date: 2026-10-18 10:02:17.448391
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c5e9a1f7b20'
+down_revision = '8ae0813124a4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute("CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5(content, prefix='2 3')")
+        # Backfill existing posts; new writes are indexed by services.search
+        op.execute("INSERT INTO post_fts(rowid, content) SELECT id, coalesce(content, '') FROM post")
+    elif dialect == 'mysql':
+        # InnoDB builds the index from the existing rows
+        op.execute('CREATE FULLTEXT INDEX ix_post_content_fulltext ON post (content)')
+    elif dialect == 'postgresql':
+        # A stored generated column is computed for every existing row
+        op.execute(
+            "ALTER TABLE post ADD COLUMN search_vector tsvector "
+            "GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED"
+        )
+        op.execute('CREATE INDEX ix_post_search_vector ON post USING GIN (search_vector)')
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        op.execute('DROP TABLE IF EXISTS post_fts')
+    elif dialect == 'mysql':
+        op.execute('DROP INDEX ix_post_content_fulltext ON post')
+    elif dialect == 'postgresql':
+        op.execute('DROP INDEX IF EXISTS ix_post_search_vector')
+        op.execute('ALTER TABLE post DROP COLUMN IF EXISTS search_vector')
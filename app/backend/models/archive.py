@@ -0,0 +1,26 @@
+from datetime import datetime
+from app.backend.extensions import db
+
+
+class ArchivePartition(db.Model):
+    """One per-month archive table of cold rows moved out by services/archive.py.
+
+    Read paths list an entity's partitions newest first and only open the
+    month tables their cursor has reached; min_id/max_id locate a row by id.
+    """
+    __tablename__ = 'archive_partition'
+    __table_args__ = {'extend_existing': True}
+    entity = db.Column(db.String(20), primary_key=True)
+    # 'YYYYMM' of the archived rows' sort timestamp
+    month = db.Column(db.String(6), primary_key=True)
+    table_name = db.Column(db.String(64), nullable=False)
+    row_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    min_id = db.Column(db.Integer, nullable=True)
+    max_id = db.Column(db.Integer, nullable=True)
+    # Newest sort timestamp archived into this month
+    max_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    @property
+    def starts_at(self):
+        return datetime.strptime(self.month, '%Y%m')
@@ -0,0 +1,21 @@
+from datetime import datetime
+from app.backend.extensions import db
+
+
+class ChangeLog(db.Model):
+    """One insert, update or delete of a synced row; the id is the sync cursor."""
+    __tablename__ = 'change_log'
+    __table_args__ = (
+        # Private changes (messages) are read per user in id order
+        db.Index('ix_change_log_user_id_id', 'user_id', 'id'),
+        {'extend_existing': True}
+    )
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    entity_type = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    # Second key of composite entities: the liking user of a like
+    actor_id = db.Column(db.Integer, nullable=True)
+    op = db.Column(db.String(10), nullable=False)
+    # Only this user may see the change; NULL means everyone
+    user_id = db.Column(db.Integer, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, nullable=False)
@@ -3,12 +3,40 @@ from app.backend.extensions import db
 from app.backend.models.user import User
 from app.backend.models.post import Post
 
+# Materialized path: the zero-padded ids of a comment's ancestors and itself,
+# so sorting by path lists a thread depth-first and a subtree is a prefix range
+PATH_SEGMENT_WIDTH = 10
+PATH_LENGTH = 255
+MAX_DEPTH = PATH_LENGTH // PATH_SEGMENT_WIDTH - 1
+
 class Comment(db.Model):
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        db.Index('ix_comment_post_id_created_at_id', 'post_id', 'created_at', 'id'),
+        db.Index('ix_comment_post_id_path', 'post_id', 'path'),
+        db.Index('ix_comment_parent_id', 'parent_id'),
+        {'extend_existing': True}
+    )
     id = db.Column(db.Integer, primary_key=True)
     post_id = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    parent_id = db.Column(db.Integer, db.ForeignKey('comment.id'), nullable=True)
+    path = db.Column(db.String(PATH_LENGTH), nullable=False, default='')
+    depth = db.Column(db.Integer, nullable=False, default=0, server_default='0')
     content = db.Column(db.Text, nullable=False)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     post = db.relationship('Post', backref=db.backref('comments', lazy=True))
-    user = db.relationship('User', backref=db.backref('comments', lazy=True)) 
\ No newline at end of file
+    user = db.relationship('User', backref=db.backref('comments', lazy=True))
+
+    @staticmethod
+    def path_segment(comment_id):
+        return str(comment_id).zfill(PATH_SEGMENT_WIDTH)
+
+    def assign_path(self, parent=None):
+        """Set path and depth once the id is known (after a flush)."""
+        self.path = (parent.path if parent else '') + Comment.path_segment(self.id)
+        self.depth = parent.depth + 1 if parent else 0
+
+    @staticmethod
+    def subtree_upper_bound(path):
+        """Exclusive upper bound of the paths below `path`: every digit sorts before ':'."""
+        return path + ':'
@@ -0,0 +1,34 @@
+from datetime import datetime
+from app.backend.extensions import db
+
+
+class Connection(db.Model):
+    """A directed connection edge.
+
+    A request is one 'pending' row from the requester. Once accepted, the
+    row becomes 'accepted' and the reverse row is added, so a user's
+    connections are always a range read on (user_id, status).
+    """
+    __table_args__ = (
+        db.Index('ix_connection_user_id_status_created_at', 'user_id', 'status', 'created_at'),
+        db.Index('ix_connection_friend_id_status', 'friend_id', 'status'),
+        {'extend_existing': True}
+    )
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    friend_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    status = db.Column(db.String(20), nullable=False, default='pending')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class ConnectionSuggestion(db.Model):
+    """Precomputed "people you may know" entry, rebuilt by the batch job."""
+    __tablename__ = 'connection_suggestion'
+    __table_args__ = (
+        db.Index('ix_connection_suggestion_user_id_rank', 'user_id', 'rank'),
+        {'extend_existing': True}
+    )
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    mutual_count = db.Column(db.Integer, nullable=False, default=0)
+    rank = db.Column(db.Integer, nullable=False)
+    computed_at = db.Column(db.DateTime, default=datetime.utcnow)
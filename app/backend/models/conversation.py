@@ -0,0 +1,38 @@
+from datetime import datetime
+from app.backend.extensions import db
+
+
+class Conversation(db.Model):
+    """Direct messages between two users, keyed by (lower id, higher id).
+
+    last_message_id, last_sent_at and the unread counters are updated in the
+    same transaction as each message insert (services/messaging.py).
+    """
+    __table_args__ = (
+        db.UniqueConstraint('user_a_id', 'user_b_id', name='uq_conversation_user_a_id_user_b_id'),
+        # Inbox of either participant, newest conversation first
+        db.Index('ix_conversation_user_a_id_last_sent_at_id', 'user_a_id', 'last_sent_at', 'id'),
+        db.Index('ix_conversation_user_b_id_last_sent_at_id', 'user_b_id', 'last_sent_at', 'id'),
+        {'extend_existing': True}
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    user_a_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_b_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    last_message_id = db.Column(db.Integer, nullable=True)
+    last_sent_at = db.Column(db.DateTime, nullable=True)
+    unread_a = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    unread_b = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    @staticmethod
+    def pair(user_id, other_id):
+        return (user_id, other_id) if user_id < other_id else (other_id, user_id)
+
+    def has_participant(self, user_id):
+        return user_id in (self.user_a_id, self.user_b_id)
+
+    def other_participant(self, user_id):
+        return self.user_b_id if user_id == self.user_a_id else self.user_a_id
+
+    def unread_for(self, user_id):
+        return self.unread_a if user_id == self.user_a_id else self.unread_b
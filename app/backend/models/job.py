@@ -1,10 +1,33 @@
+from datetime import datetime
 from app.backend.extensions import db
 
 class Job(db.Model):
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Newest-first listing, alone or filtered by one company or location
+        db.Index('ix_job_posted_at_id', 'posted_at', 'id'),
+        db.Index('ix_job_company_posted_at_id', 'company', 'posted_at', 'id'),
+        db.Index('ix_job_location_posted_at_id', 'location', 'posted_at', 'id'),
+        {'extend_existing': True}
+    )
     id = db.Column(db.Integer, primary_key=True)
     title = db.Column(db.String(120), nullable=False)
     description = db.Column(db.Text, nullable=False)
     company = db.Column(db.String(120), nullable=False)
     location = db.Column(db.String(120), nullable=True)
-    posted_at = db.Column(db.DateTime)
+    posted_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+
+class JobFacetCount(db.Model):
+    """Number of jobs per (company, location), kept in step by services/jobs.py.
+
+    Facet counts sum these rows instead of grouping the job table. A job
+    without a location is counted under location ''.
+    """
+    __tablename__ = 'job_facet_count'
+    __table_args__ = (
+        db.Index('ix_job_facet_count_location_company', 'location', 'company'),
+        {'extend_existing': True}
+    )
+    company = db.Column(db.String(120), primary_key=True)
+    location = db.Column(db.String(120), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
@@ -1,9 +1,15 @@
+from datetime import datetime
 from app.backend.extensions import db
 
 class Message(db.Model):
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        # Conversation history, newest first
+        db.Index('ix_message_conversation_id_sent_at_id', 'conversation_id', 'sent_at', 'id'),
+        {'extend_existing': True}
+    )
     id = db.Column(db.Integer, primary_key=True)
+    conversation_id = db.Column(db.Integer, db.ForeignKey('conversation.id'), nullable=False)
     sender_id = db.Column(db.Integer, nullable=False)
     receiver_id = db.Column(db.Integer, nullable=False)
     content = db.Column(db.Text, nullable=False)
-    sent_at = db.Column(db.DateTime)
+    sent_at = db.Column(db.DateTime, default=datetime.utcnow)
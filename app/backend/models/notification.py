@@ -0,0 +1,25 @@
+from datetime import datetime
+from app.backend.extensions import db
+
+
+class Notification(db.Model):
+    """Likes or comments on one post, coalesced per recipient and time window."""
+    __table_args__ = (
+        # Unread count and listing for one recipient
+        db.Index('ix_notification_recipient_id_read', 'recipient_id', 'read'),
+        db.Index('ix_notification_recipient_id_updated_at_id', 'recipient_id', 'updated_at', 'id'),
+        # Finding the open group an event is merged into
+        db.Index('ix_notification_group', 'recipient_id', 'post_id', 'type', 'window_start'),
+        {'extend_existing': True}
+    )
+    id = db.Column(db.Integer, primary_key=True)
+    recipient_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    type = db.Column(db.String(20), nullable=False)
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    # Most recent distinct actors first, comma-separated
+    actor_ids = db.Column(db.String(255), nullable=True)
+    window_start = db.Column(db.DateTime, nullable=False)
+    read = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow)
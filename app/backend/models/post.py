@@ -1,14 +1,30 @@
 from datetime import datetime
+from sqlalchemy.orm import deferred
 from app.backend.extensions import db
 from app.backend.models.user import User
 
 class Post(db.Model):
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        db.Index('ix_post_created_at_id', 'created_at', 'id'),
+        db.Index('ix_post_likes_id', 'likes', 'id'),
+        db.Index('ix_post_views_id', 'views', 'id'),
+        db.Index('ix_post_simhash', 'simhash'),
+        {'extend_existing': True}
+    )
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     content = db.Column(db.Text, nullable=False)
     media_url = db.Column(db.String(255), nullable=True)
     likes = db.Column(db.Integer, default=0)
+    comment_count = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    views = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    unique_viewers = db.Column(db.Integer, nullable=False, default=0, server_default='0')
+    # HyperLogLog registers behind unique_viewers (services/views.py); only read when flushing views
+    viewer_hll = deferred(db.Column(db.LargeBinary, nullable=True))
+    # Near-duplicate detection (services/duplicates.py)
+    simhash = db.Column(db.BigInteger, nullable=True)
+    duplicate_of = db.Column(db.Integer, db.ForeignKey('post.id'), nullable=True)
+    collapsed = db.Column(db.Boolean, nullable=False, default=False, server_default=db.false())
     tags = db.Column(db.String(255), nullable=True)
     category = db.Column(db.String(100), nullable=True)
     visibility = db.Column(db.String(20), default='public')
@@ -0,0 +1,14 @@
+from datetime import datetime
+from app.backend.extensions import db
+
+
+class PostLike(db.Model):
+    __tablename__ = 'post_like'
+    __table_args__ = (
+        db.Index('ix_post_like_post_id', 'post_id'),
+        {'extend_existing': True}
+    )
+    # One row per (user, post): the primary key is what enforces one like per user
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -0,0 +1,12 @@
+from app.backend.extensions import db
+
+
+class SimhashBand(db.Model):
+    """One LSH bucket of a post's SimHash: the value of bits [band * width, (band + 1) * width)."""
+    __tablename__ = 'post_simhash_band'
+    __table_args__ = {'extend_existing': True}
+    # (band, bucket) prefix is the lookup index for candidate matches
+    band = db.Column(db.SmallInteger, primary_key=True)
+    # At most 31 bits wide: services/duplicates.py requires DUPLICATE_BANDS >= 3
+    bucket = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), primary_key=True)
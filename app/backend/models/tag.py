@@ -0,0 +1,58 @@
+from sqlalchemy.exc import IntegrityError
+from app.backend.extensions import db
+
+MAX_TAG_LENGTH = 50
+MAX_TAGS_PER_POST = 10
+
+post_tag = db.Table(
+    'post_tag',
+    db.Column('post_id', db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), primary_key=True),
+    db.Column('tag_id', db.Integer, db.ForeignKey('tag.id', ondelete='CASCADE'), primary_key=True),
+    # The primary key serves post -> tags; this one serves tag -> posts
+    db.Index('ix_post_tag_tag_id_post_id', 'tag_id', 'post_id'),
+    extend_existing=True
+)
+
+
+class Tag(db.Model):
+    __table_args__ = {'extend_existing': True}
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(MAX_TAG_LENGTH), unique=True, nullable=False)
+    posts = db.relationship('Post', secondary=post_tag, backref=db.backref('tag_list', lazy=True), lazy=True)
+
+    @staticmethod
+    def normalize(raw):
+        """Split comma-separated or list input into unique lowercase tag names, keeping order."""
+        if isinstance(raw, str):
+            raw = raw.split(',')
+        names = []
+        for name in raw or []:
+            name = ' '.join(name.strip().lower().split())[:MAX_TAG_LENGTH]
+            if name and name not in names:
+                names.append(name)
+        return names
+
+    @staticmethod
+    def get_or_create(names):
+        """Return Tag rows for `names`, creating the missing ones, in one lookup query."""
+        existing = {t.name: t for t in Tag.query.filter(Tag.name.in_(names))} if names else {}
+        tags = []
+        for name in names:
+            tag = existing.get(name)
+            if tag is None:
+                tag = Tag._insert(name)
+                existing[name] = tag
+            tags.append(tag)
+        return tags
+
+    @staticmethod
+    def _insert(name):
+        """Insert one new tag, or load the row a concurrent request committed first."""
+        tag = Tag(name=name)
+        try:
+            with db.session.begin_nested():
+                db.session.add(tag)
+        except IntegrityError:
+            # A locking read sees the committed row even under REPEATABLE READ
+            tag = Tag.query.filter_by(name=name).with_for_update(read=True).one()
+        return tag
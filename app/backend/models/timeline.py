@@ -0,0 +1,24 @@
+from datetime import datetime
+from app.backend.extensions import db
+
+
+class TimelineEntry(db.Model):
+    """A post id materialized into a user's home timeline."""
+    __tablename__ = 'timeline_entry'
+    __table_args__ = {'extend_existing': True}
+    # (user_id, post_id) doubles as the index for newest-first range reads
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    post_id = db.Column(db.Integer, db.ForeignKey('post.id', ondelete='CASCADE'), primary_key=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+
+class PullAuthor(db.Model):
+    """Author whose audience exceeded FEED_FANOUT_THRESHOLD.
+
+    Their posts are not fanned out; followers merge them in at read time.
+    """
+    __tablename__ = 'timeline_pull_author'
+    __table_args__ = {'extend_existing': True}
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    audience_size = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
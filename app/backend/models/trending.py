@@ -0,0 +1,20 @@
+from datetime import datetime
+from app.backend.extensions import db
+
+
+class TrendingSnapshot(db.Model):
+    """Persisted count-min sketch and top-K candidates of one trending window.
+
+    Counts are stored relative to `landmark` (unix seconds); see
+    services/trending.py for how they decay.
+    """
+    __tablename__ = 'trending_snapshot'
+    __table_args__ = {'extend_existing': True}
+    window = db.Column(db.String(16), primary_key=True)
+    landmark = db.Column(db.Float, nullable=False)
+    width = db.Column(db.Integer, nullable=False)
+    depth = db.Column(db.Integer, nullable=False)
+    # Sized past MySQL's 64 KiB BLOB limit (MEDIUMBLOB); the default sketch is 2048 * 4 * 8 bytes
+    counters = db.Column(db.LargeBinary(length=2**24), nullable=False)
+    top = db.Column(db.Text, nullable=False)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -7,6 +7,8 @@ class User(db.Model):
     username = db.Column(db.String(80), unique=True, nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     password_hash = db.Column(db.Text, nullable=False)
+    # Written lazily from presence heartbeats (services/presence.py)
+    last_seen_at = db.Column(db.DateTime, nullable=True)
     # Profile relationship is defined in Profile model
 
     def set_password(self, password):
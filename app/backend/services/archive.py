@@ -0,0 +1,298 @@
+"""Hot/cold archival of old posts and messages.
+
+Rows whose sort timestamp (Post.created_at, Message.sent_at) is older than
+ARCHIVE_POST_AFTER_DAYS / ARCHIVE_MESSAGE_AFTER_DAYS are moved, in chunks of
+ARCHIVE_BATCH_SIZE with ARCHIVE_BATCH_PAUSE seconds between chunks, into
+per-month tables such as ``post_archive_202401``. Missing month tables are
+created and committed first; each chunk is then one transaction: INSERT ...
+SELECT into the month table, DELETE from the hot table, and an update of the
+month's ``archive_partition`` row. The hot tables and their indexes then
+only hold the recent window.
+
+A post moves together with its comments and likes (into
+``comment_archive_YYYYMM`` and ``post_like_archive_YYYYMM`` of the post's
+month). Its tag links, SimHash bands, timeline entries and notifications
+only serve recent activity and are deleted, as is the post's full-text
+entry. Sync clients get delete entries in change_log for the moved posts,
+comments and likes; archived messages stay readable in their conversation
+and are not logged. Rows still referenced from the hot tables stay put: a
+conversation's last message, and posts that a hot post is marked a
+duplicate of.
+
+Archive tables are created at runtime and have no foreign keys. Reads
+reach them through ``archive_keyset_page`` in api/pagination.py, which only
+opens a month table once a newest-first cursor has passed the hot rows.
+"""
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import Column, Index, MetaData, Table, delete, exists, func, insert, select
+from app.backend.extensions import db
+from app.backend.models.archive import ArchivePartition
+from app.backend.models.comment import Comment
+from app.backend.models.conversation import Conversation
+from app.backend.models.message import Message
+from app.backend.models.notification import Notification
+from app.backend.models.post import Post
+from app.backend.models.post_like import PostLike
+from app.backend.models.simhash import SimhashBand
+from app.backend.models.tag import post_tag
+from app.backend.models.timeline import TimelineEntry
+from app.backend.services.changes import log_deletes
+from app.backend.services.search import get_backend as get_search_backend
+
+logger = logging.getLogger(__name__)
+
+# Archive tables live outside db.metadata so create_all and migrations ignore them
+archive_metadata = MetaData()
+
+# entity: (model, sort column, indexes of its month tables)
+ENTITIES = {
+    'post': (Post, 'created_at', [('user_id', 'created_at', 'id')]),
+    'message': (Message, 'sent_at', [('conversation_id', 'sent_at', 'id')]),
+}
+
+# Rows moved along with a post, into the post's month: (model, post id column, indexes)
+POST_DEPENDENTS = [
+    (Comment, 'post_id', [('post_id', 'created_at', 'id')]),
+    (PostLike, 'post_id', [('post_id',)]),
+]
+
+# Rows that only index recent posts and are dropped when a post is archived
+POST_DERIVED = [post_tag, SimhashBand.__table__, TimelineEntry.__table__, Notification.__table__]
+
+
+def table_name(model, month):
+    return f'{model.__table__.name}_archive_{month}'
+
+
+def archive_table(model, month, indexes):
+    """The month table mirroring `model`'s columns, without constraints."""
+    name = table_name(model, month)
+    table = archive_metadata.tables.get(name)
+    if table is None:
+        columns = [
+            Column(c.name, c.type, primary_key=c.primary_key, nullable=c.nullable, autoincrement=False)
+            for c in model.__table__.columns
+        ]
+        index_list = [Index(f'ix_{name}_{"_".join(cols)}', *cols) for cols in indexes]
+        table = Table(name, archive_metadata, *columns, *index_list)
+    return table
+
+
+def partition_table(partition):
+    model, _, indexes = ENTITIES[partition.entity]
+    return archive_table(model, partition.month, indexes)
+
+
+def partitions(entity):
+    """The entity's archive partitions, newest month first."""
+    return ArchivePartition.query.filter_by(entity=entity).order_by(ArchivePartition.month.desc()).all()
+
+
+def post_month_tables(model):
+    """Month tables of Post or of a row type moved with posts, newest month first."""
+    indexes = {dependent: cols for dependent, _, cols in POST_DEPENDENTS}.get(model, ENTITIES['post'][2])
+    return [archive_table(model, partition.month, indexes) for partition in partitions('post')]
+
+
+def hydrate(model, rows, month):
+    """Turn archive rows into transient model instances the serializers accept."""
+    items = []
+    for row in rows:
+        item = model(**row._mapping)
+        item.archive_month = month
+        items.append(item)
+    return items
+
+
+def find_archived(entity, row_id):
+    """Look up one archived row by id, or None."""
+    model = ENTITIES[entity][0]
+    candidates = ArchivePartition.query.filter(
+        ArchivePartition.entity == entity,
+        ArchivePartition.min_id <= row_id,
+        ArchivePartition.max_id >= row_id
+    ).order_by(ArchivePartition.month.desc())
+    for partition in candidates:
+        table = partition_table(partition)
+        row = db.session.execute(select(table).where(table.c.id == row_id)).first()
+        if row is not None:
+            return hydrate(model, [row], partition.month)[0]
+    return None
+
+
+def archived_comments(post_id, *criteria, order_by=('created_at', 'id'), limit=None):
+    """Comments of archived post `post_id` as transient Comment instances, [] if it is not archived.
+
+    `criteria` are callables receiving the month table and returning a
+    condition on it; `order_by` names the columns to sort by, ascending.
+    """
+    post = find_archived('post', post_id)
+    if post is None:
+        return []
+    table = archive_table(Comment, post.archive_month, POST_DEPENDENTS[0][2])
+    stmt = select(table).where(table.c.post_id == post_id, *[criterion(table) for criterion in criteria])
+    stmt = stmt.order_by(*[table.c[name].asc() for name in order_by])
+    if limit is not None:
+        stmt = stmt.limit(limit)
+    return hydrate(Comment, db.session.execute(stmt), post.archive_month)
+
+
+def load_archived_comments(posts, limit=None):
+    """Comments of archived posts grouped by post id, like serializers.load_comments."""
+    by_month = defaultdict(list)
+    for post in posts:
+        by_month[post.archive_month].append(post.id)
+    comments = {post.id: [] for post in posts}
+    for month, post_ids in by_month.items():
+        table = archive_table(Comment, month, POST_DEPENDENTS[0][2])
+        stmt = select(table).where(table.c.post_id.in_(post_ids))
+        if limit is not None:
+            position = func.row_number().over(
+                partition_by=table.c.post_id, order_by=(table.c.created_at.desc(), table.c.id.desc())
+            ).label('position')
+            newest = select(table.c.id, position).where(table.c.post_id.in_(post_ids)).subquery()
+            stmt = stmt.join(newest, newest.c.id == table.c.id).where(newest.c.position <= limit)
+        stmt = stmt.order_by(table.c.created_at.asc(), table.c.id.asc())
+        for comment in hydrate(Comment, db.session.execute(stmt), month):
+            comments[comment.post_id].append(comment)
+    return comments
+
+
+def _record_partition(entity, month, model, moved):
+    """Add one chunk's (id, sort value) pairs to the month's registry row."""
+    partition = db.session.get(ArchivePartition, (entity, month), with_for_update=True)
+    if partition is None:
+        partition = ArchivePartition(entity=entity, month=month, table_name=table_name(model, month), row_count=0)
+        db.session.add(partition)
+    ids = [row_id for row_id, _ in moved]
+    newest = max(sort_value for _, sort_value in moved)
+    partition.row_count += len(moved)
+    partition.min_id = min(ids) if partition.min_id is None else min(partition.min_id, *ids)
+    partition.max_id = max(ids) if partition.max_id is None else max(partition.max_id, *ids)
+    partition.max_at = newest if partition.max_at is None else max(partition.max_at, newest)
+
+
+def _create_month_tables(entity, months):
+    """Create the month tables a chunk writes to, committed before the chunk starts.
+
+    DDL commits implicitly on MySQL, so creating a table inside the chunk's
+    transaction would commit the chunk's earlier copies with it.
+    """
+    model, _, indexes = ENTITIES[entity]
+    tables = [(model, indexes)]
+    if model is Post:
+        tables += [(dependent, dependent_indexes) for dependent, _, dependent_indexes in POST_DEPENDENTS]
+    connection = db.session.connection()
+    for month in months:
+        for table_model, table_indexes in tables:
+            archive_table(table_model, month, table_indexes).create(connection, checkfirst=True)
+    db.session.commit()
+
+
+def _copy_rows(connection, source, target, column, ids):
+    columns = [c.name for c in source.columns]
+    connection.execute(insert(target).from_select(columns, select(*source.columns).where(source.c[column].in_(ids))))
+
+
+def _delete_posts(connection, ids):
+    """Remove archived posts and the rows hanging off them from the hot tables.
+
+    These are Core deletes, so the search index and change log listeners on
+    the models do not fire; both are updated here in the same transaction.
+    """
+    comments, likes = Comment.__table__, PostLike.__table__
+    comment_rows = connection.execute(select(comments.c.id, comments.c.depth).where(comments.c.post_id.in_(ids))).all()
+    like_rows = connection.execute(select(likes.c.post_id, likes.c.user_id).where(likes.c.post_id.in_(ids))).all()
+    for derived in POST_DERIVED:
+        connection.execute(delete(derived).where(derived.c.post_id.in_(ids)))
+    connection.execute(delete(likes).where(likes.c.post_id.in_(ids)))
+    # Replies before their parents: comment.parent_id has no ON DELETE rule and InnoDB checks it row by row
+    for depth in sorted({depth for _, depth in comment_rows}, reverse=True):
+        connection.execute(delete(comments).where(comments.c.post_id.in_(ids), comments.c.depth == depth))
+    connection.execute(delete(Post.__table__).where(Post.__table__.c.id.in_(ids)))
+    search = get_search_backend()
+    for post_id in ids:
+        search.remove_post(connection, post_id)
+    log_deletes(connection, 'post', [(post_id, None) for post_id in ids])
+    log_deletes(connection, 'comment', [(comment_id, None) for comment_id, _ in comment_rows])
+    log_deletes(connection, 'like', [tuple(row) for row in like_rows])
+
+
+def archive_batch(entity, cutoff, batch_size=500):
+    """Move up to `batch_size` rows older than `cutoff` in one transaction. Returns rows moved."""
+    model, sort_name, indexes = ENTITIES[entity]
+    source = model.__table__
+    sort_col = source.c[sort_name]
+    stmt = select(source.c.id, sort_col).where(sort_col < cutoff)
+    if model is Message:
+        last_messages = select(Conversation.last_message_id).where(Conversation.last_message_id.isnot(None))
+        stmt = stmt.where(source.c.id.notin_(last_messages))
+    else:
+        referring = source.alias('referring')
+        stmt = stmt.where(~exists().where(referring.c.duplicate_of == source.c.id))
+    rows = db.session.execute(stmt.order_by(source.c.id).limit(batch_size)).all()
+    if not rows:
+        return 0
+    _create_month_tables(entity, {sort_value.strftime('%Y%m') for _, sort_value in rows})
+    # The chunk's own transaction starts here; re-read rows that changed meanwhile
+    rows = db.session.execute(stmt.where(source.c.id.in_([row_id for row_id, _ in rows])).order_by(source.c.id)).all()
+    if not rows:
+        return 0
+    months = defaultdict(list)
+    for row_id, sort_value in rows:
+        months[sort_value.strftime('%Y%m')].append((row_id, sort_value))
+    connection = db.session.connection()
+    for month, moved in months.items():
+        ids = [row_id for row_id, _ in moved]
+        _copy_rows(connection, source, archive_table(model, month, indexes), 'id', ids)
+        if model is Post:
+            for dependent, column, dependent_indexes in POST_DEPENDENTS:
+                _copy_rows(connection, dependent.__table__, archive_table(dependent, month, dependent_indexes), column, ids)
+            _delete_posts(connection, ids)
+        else:
+            connection.execute(delete(source).where(source.c.id.in_(ids)))
+        _record_partition(entity, month, model, moved)
+    db.session.commit()
+    return len(rows)
+
+
+def archive(entity, older_than_days=None, batch_size=None, pause=None, max_batches=None):
+    """Move every `entity` row older than the hot window, chunk by chunk. Returns rows moved."""
+    config = current_app.config
+    if older_than_days is None:
+        older_than_days = config.get(f'ARCHIVE_{entity.upper()}_AFTER_DAYS', 365)
+    batch_size = batch_size or config.get('ARCHIVE_BATCH_SIZE', 500)
+    pause = config.get('ARCHIVE_BATCH_PAUSE', 0.2) if pause is None else pause
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    moved = batches = 0
+    while max_batches is None or batches < max_batches:
+        count = archive_batch(entity, cutoff, batch_size)
+        if not count:
+            break
+        moved += count
+        batches += 1
+        logger.info('Archived %d %s rows (%d so far)', count, entity, moved)
+        # Throttle so archival does not starve live traffic of I/O and locks
+        if pause:
+            time.sleep(pause)
+    return moved
+
+
+@click.command('archive-cold')
+@click.option('--entity', type=click.Choice(['all', *ENTITIES]), default='all', show_default=True)
+@click.option('--older-than-days', type=int, default=None, help='Overrides ARCHIVE_<ENTITY>_AFTER_DAYS.')
+@click.option('--batch-size', type=int, default=None, help='Overrides ARCHIVE_BATCH_SIZE.')
+@click.option('--pause', type=float, default=None, help='Seconds between chunks; overrides ARCHIVE_BATCH_PAUSE.')
+@click.option('--max-batches', type=int, default=None, help='Stop after this many chunks per entity.')
+@with_appcontext
+def archive_cold_command(entity, older_than_days, batch_size, pause, max_batches):
+    """Move old posts and messages into per-month archive tables."""
+    for name in (ENTITIES if entity == 'all' else [entity]):
+        moved = archive(name, older_than_days, batch_size, pause, max_batches)
+        click.echo(f'Archived {moved} {name} rows')
@@ -0,0 +1,90 @@
+"""In-process write-behind buffer for counters.
+
+Increments are summed per key in memory and handed to a flush callback in
+one batch when the buffer holds `threshold` keys or `interval` seconds have
+passed since the last flush. A daemon thread per process drives the
+interval flush; it is started lazily so it is created after gunicorn forks.
+"""
+import atexit
+import logging
+import threading
+import time
+from collections import Counter
+
+logger = logging.getLogger(__name__)
+
+
+class CounterBuffer:
+    def __init__(self, name, flush_fn, interval=2.0, threshold=100):
+        self.name = name
+        self.flush_fn = flush_fn
+        self.interval = interval
+        self.threshold = threshold
+        self.app = None
+        self._pending = Counter()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._thread = None
+        self._last_flush = time.monotonic()
+
+    def init_app(self, app, interval=None, threshold=None):
+        self.app = app
+        if interval is not None:
+            self.interval = interval
+        if threshold is not None:
+            self.threshold = threshold
+        app.extensions[self.name] = self
+        atexit.register(self.flush)
+
+    def add(self, key, delta=1):
+        with self._lock:
+            self._pending[key] += delta
+            size = len(self._pending)
+        self._ensure_thread()
+        if size >= self.threshold:
+            self.flush()
+
+    def pending(self, key):
+        """Delta for `key` not yet written to the database."""
+        with self._lock:
+            return self._pending.get(key, 0)
+
+    def pending_many(self, keys):
+        with self._lock:
+            return {k: self._pending.get(k, 0) for k in keys}
+
+    def flush(self):
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, Counter()
+                self._last_flush = time.monotonic()
+            batch = {k: v for k, v in batch.items() if v}
+            if not batch:
+                return 0
+            try:
+                if self.app is not None:
+                    with self.app.app_context():
+                        self.flush_fn(batch)
+                else:
+                    self.flush_fn(batch)
+            except Exception:
+                logger.exception('Flushing %s buffer failed, keeping %d keys for retry', self.name, len(batch))
+                with self._lock:
+                    self._pending.update(batch)
+                return 0
+            return len(batch)
+
+    def _ensure_thread(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name=f'{self.name}-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.interval)
+            if time.monotonic() - self._last_flush >= self.interval:
+                self.flush()
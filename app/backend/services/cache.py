@@ -0,0 +1,208 @@
+"""Small shared cache with TTLs and explicit invalidation.
+
+Three backends are available through CACHE_BACKEND:
+
+- ``memory``: a dict in the current process. Each gunicorn worker has its own.
+- ``sqlite``: a local SQLite file (CACHE_URL is the path) shared by every
+  worker on the host.
+- ``redis``: any Redis-compatible server (CACHE_URL is the redis:// URL).
+  Requires the ``redis`` package.
+
+Values are JSON documents or raw bytes.
+"""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from functools import wraps
+
+try:
+    import redis
+except ImportError:  # optional dependency
+    redis = None
+
+_MISSING = object()
+
+
+def _dumps(value):
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return b'b' + bytes(value)
+    return b'j' + json.dumps(value, separators=(',', ':')).encode()
+
+
+def _loads(raw):
+    raw = bytes(raw)
+    if raw[:1] == b'b':
+        return raw[1:]
+    return json.loads(raw[1:])
+
+
+class MemoryBackend:
+    # Each process has its own copy: a delete is not seen by other workers
+    shared = False
+
+    def __init__(self, url=None):
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return None
+            raw, expires_at = item
+            if expires_at is not None and expires_at <= time.time():
+                del self._data[key]
+                return None
+            return raw
+
+    def set(self, key, raw, ttl):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (raw, expires_at)
+
+    def delete(self, *keys):
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class SQLiteBackend:
+    shared = True
+
+    def __init__(self, url=None):
+        self.path = url or os.path.join(tempfile.gettempdir(), 'zara-cache.sqlite3')
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL)')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute('SELECT value, expires_at FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        if row[1] is not None and row[1] <= time.time():
+            self.delete(key)
+            return None
+        return row[0]
+
+    def set(self, key, raw, ttl):
+        expires_at = time.time() + ttl if ttl else None
+        self._conn().execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, sqlite3.Binary(raw), expires_at)
+        )
+
+    def delete(self, *keys):
+        if keys:
+            self._conn().executemany('DELETE FROM cache WHERE key = ?', [(k,) for k in keys])
+
+    def clear(self):
+        self._conn().execute('DELETE FROM cache')
+
+
+class RedisBackend:
+    shared = True
+
+    def __init__(self, url=None):
+        if redis is None:
+            raise RuntimeError('CACHE_BACKEND=redis requires the redis package')
+        self._client = redis.Redis.from_url(url or 'redis://localhost:6379/0')
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, raw, ttl):
+        self._client.set(key, raw, ex=int(ttl) if ttl else None)
+
+    def delete(self, *keys):
+        if keys:
+            self._client.delete(*keys)
+
+    def clear(self):
+        self._client.flushdb()
+
+
+BACKENDS = {
+    'memory': MemoryBackend,
+    'sqlite': SQLiteBackend,
+    'redis': RedisBackend,
+}
+
+
+class Cache:
+    def __init__(self, app=None):
+        self.backend = MemoryBackend()
+        self.default_ttl = 300
+        self.prefix = 'zara:'
+        self.hits = 0
+        self.misses = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('CACHE_BACKEND', 'memory')
+        if backend not in BACKENDS:
+            raise ValueError(f'Unknown CACHE_BACKEND {backend!r}')
+        self.backend = BACKENDS[backend](app.config.get('CACHE_URL'))
+        self.default_ttl = app.config.get('CACHE_DEFAULT_TTL', self.default_ttl)
+        self.prefix = app.config.get('CACHE_KEY_PREFIX', self.prefix)
+        app.extensions['cache'] = self
+
+    @property
+    def shared(self):
+        """Whether every worker sees the same entries (and the same deletes)."""
+        return self.backend.shared
+
+    def get(self, key, default=None):
+        raw = self.backend.get(self.prefix + key)
+        if raw is None:
+            self.misses += 1
+            return default
+        self.hits += 1
+        return _loads(raw)
+
+    def set(self, key, value, ttl=None):
+        self.backend.set(self.prefix + key, _dumps(value), self.default_ttl if ttl is None else ttl)
+
+    def delete(self, *keys):
+        self.backend.delete(*[self.prefix + k for k in keys])
+
+    def clear(self):
+        self.backend.clear()
+
+    def stats(self):
+        return {'hits': self.hits, 'misses': self.misses}
+
+    def cached(self, key, ttl=None):
+        """Decorator caching a function's JSON-serializable result.
+
+        `key` is a string, or a callable receiving the function's arguments
+        and returning the key.
+        """
+        def decorator(fn):
+            @wraps(fn)
+            def wrapper(*args, **kwargs):
+                cache_key = key(*args, **kwargs) if callable(key) else key
+                value = self.get(cache_key, _MISSING)
+                if value is _MISSING:
+                    value = fn(*args, **kwargs)
+                    self.set(cache_key, value, ttl)
+                return value
+            wrapper.cache_key = key
+            return wrapper
+        return decorator
@@ -0,0 +1,159 @@
+"""Change log behind GET /sync.
+
+Inserts, updates and deletes of posts, comments, likes and messages made
+through the ORM are collected by mapper events and written to change_log
+with one batched INSERT per flush, inside the same transaction, so a change
+is logged if and only if it commits. Messages are logged once per
+participant with user_id set; everything else is public.
+
+Counter bumps issued as Core UPDATEs (likes, views, comment_count) are not
+logged: likes and comments are synced as entities of their own.
+
+``flask prune-change-log`` deletes changes older than SYNC_RETENTION_DAYS,
+always keeping the newest one so ids never restart. A cursor below the
+oldest kept change can no longer be served incrementally; GET /sync tells
+such clients to reload their state instead.
+"""
+import logging
+import time
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import delete, event, insert, or_, select, func
+from sqlalchemy.orm import object_session
+from app.backend.extensions import db
+from app.backend.models.change_log import ChangeLog
+from app.backend.models.post import Post
+from app.backend.models.comment import Comment
+from app.backend.models.post_like import PostLike
+from app.backend.models.message import Message
+
+ENTITY_TYPES = {Post: 'post', Comment: 'comment', PostLike: 'like', Message: 'message'}
+
+logger = logging.getLogger(__name__)
+
+
+def _entries(target, op):
+    entity_type = ENTITY_TYPES[type(target)]
+    if isinstance(target, PostLike):
+        entity_id, actor_id = target.post_id, target.user_id
+    else:
+        entity_id, actor_id = target.id, None
+    if isinstance(target, Message):
+        audience = {target.sender_id, target.receiver_id}
+    else:
+        audience = {None}
+    now = datetime.utcnow()
+    return [
+        {'entity_type': entity_type, 'entity_id': entity_id, 'actor_id': actor_id,
+         'op': op, 'user_id': user_id, 'created_at': now}
+        for user_id in audience
+    ]
+
+
+def _collect(op):
+    def listener(mapper, connection, target):
+        object_session(target).info.setdefault('change_log', []).extend(_entries(target, op))
+    return listener
+
+
+for _model in ENTITY_TYPES:
+    event.listen(_model, 'after_insert', _collect('upsert'))
+    event.listen(_model, 'after_update', _collect('upsert'))
+    event.listen(_model, 'after_delete', _collect('delete'))
+
+
+@event.listens_for(db.session, 'after_flush')
+def _write_change_log(session, flush_context):
+    entries = session.info.pop('change_log', None)
+    if entries:
+        session.execute(insert(ChangeLog.__table__), entries)
+
+
+def log_deletes(connection, entity_type, keys):
+    """Log public deletes of rows removed by Core statements, which the mapper events miss.
+
+    `keys` are (entity_id, actor_id) pairs; actor_id is None except for likes.
+    """
+    if not keys:
+        return
+    now = datetime.utcnow()
+    connection.execute(insert(ChangeLog.__table__), [
+        {'entity_type': entity_type, 'entity_id': entity_id, 'actor_id': actor_id,
+         'op': 'delete', 'user_id': None, 'created_at': now}
+        for entity_id, actor_id in keys
+    ])
+
+
+def head():
+    """Id of the newest change, the cursor a client starts syncing from."""
+    return db.session.execute(select(func.max(ChangeLog.id))).scalar() or 0
+
+
+def horizon():
+    """Oldest cursor that can still sync incrementally; older cursors must resync."""
+    oldest = db.session.execute(select(func.min(ChangeLog.id))).scalar()
+    return oldest - 1 if oldest else 0
+
+
+def changes_since(user_id, after_id, limit):
+    """Up to `limit` changes visible to `user_id` after change `after_id`, oldest first.
+
+    Changes newer than SYNC_SETTLE_SECONDS are held back so that a
+    transaction that took a lower id but commits later is not skipped.
+    """
+    settle = current_app.config.get('SYNC_SETTLE_SECONDS', 2)
+    cutoff = datetime.utcnow() - timedelta(seconds=settle)
+    stmt = select(ChangeLog).where(
+        ChangeLog.id > after_id,
+        ChangeLog.created_at <= cutoff,
+        or_(ChangeLog.user_id.is_(None), ChangeLog.user_id == user_id)
+    ).order_by(ChangeLog.id).limit(limit)
+    return db.session.execute(stmt).scalars().all()
+
+
+def latest_ops(changes):
+    """{entity_type: {key: op}} keeping only the last op per entity."""
+    latest = {}
+    for change in changes:
+        key = (change.entity_id, change.actor_id) if change.entity_type == 'like' else change.entity_id
+        latest.setdefault(change.entity_type, {})[key] = change.op
+    return latest
+
+
+def prune(older_than_days=None, batch_size=1000, pause=0.2):
+    """Delete changes older than the retention window, chunk by chunk. Returns rows deleted."""
+    if older_than_days is None:
+        older_than_days = current_app.config.get('SYNC_RETENTION_DAYS', 30)
+    cutoff = datetime.utcnow() - timedelta(days=older_than_days)
+    # Prune by id so that everything at or below the horizon is gone
+    last_id = db.session.execute(select(func.max(ChangeLog.id)).where(ChangeLog.created_at < cutoff)).scalar()
+    if last_id is None:
+        return 0
+    last_id = min(last_id, head() - 1)
+    deleted = 0
+    while True:
+        ids = db.session.execute(
+            select(ChangeLog.id).where(ChangeLog.id <= last_id).order_by(ChangeLog.id).limit(batch_size)
+        ).scalars().all()
+        if not ids:
+            break
+        db.session.execute(delete(ChangeLog.__table__).where(ChangeLog.id.in_(ids)))
+        db.session.commit()
+        deleted += len(ids)
+        logger.info('Pruned %d change_log rows (%d so far)', len(ids), deleted)
+        if pause:
+            time.sleep(pause)
+    return deleted
+
+
+@click.command('prune-change-log')
+@click.option('--older-than-days', type=int, default=None, help='Overrides SYNC_RETENTION_DAYS.')
+@click.option('--batch-size', type=int, default=1000, show_default=True)
+@click.option('--pause', type=float, default=0.2, show_default=True, help='Seconds between chunks.')
+@with_appcontext
+def prune_change_log_command(older_than_days, batch_size, pause):
+    """Delete sync changes older than the retention window."""
+    deleted = prune(older_than_days, batch_size, pause)
+    click.echo(f'Pruned {deleted} change_log rows')
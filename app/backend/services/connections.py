@@ -0,0 +1,88 @@
+"""Offline "people you may know" computation.
+
+The accepted connection graph is loaded once into adjacency sets. For each
+user, second-degree neighbours are counted by how many direct connections
+they share, existing connections and open requests are excluded, and the
+top K by mutual count are stored in ``connection_suggestion``. Serving a
+suggestion list is then one indexed range read.
+"""
+import heapq
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import delete, insert, select
+from app.backend.extensions import db
+from app.backend.models.connection import Connection, ConnectionSuggestion
+
+logger = logging.getLogger(__name__)
+
+LOAD_BATCH_SIZE = 5000
+WRITE_BATCH_SIZE = 1000
+
+
+def load_graph():
+    """Accepted adjacency sets, plus every pair already linked in either direction."""
+    adjacency = defaultdict(set)
+    linked = defaultdict(set)
+    stmt = select(Connection.user_id, Connection.friend_id, Connection.status)
+    for user_id, friend_id, status in db.session.execute(stmt.execution_options(yield_per=LOAD_BATCH_SIZE)):
+        if status == 'accepted':
+            adjacency[user_id].add(friend_id)
+        linked[user_id].add(friend_id)
+        linked[friend_id].add(user_id)
+    return adjacency, linked
+
+
+def suggest(adjacency, linked, user_id, top_k):
+    """Top `top_k` (candidate_id, mutual_count) pairs for one user."""
+    friends = adjacency.get(user_id, ())
+    mutual = Counter()
+    for friend_id in friends:
+        mutual.update(adjacency.get(friend_id, ()))
+    exclude = linked.get(user_id, set())
+    candidates = (
+        (count, candidate_id) for candidate_id, count in mutual.items()
+        if candidate_id != user_id and candidate_id not in exclude
+    )
+    # Highest mutual count first, lower user id breaks ties
+    best = heapq.nsmallest(top_k, candidates, key=lambda c: (-c[0], c[1]))
+    return [(candidate_id, count) for count, candidate_id in best]
+
+
+def compute_suggestions(top_k=20):
+    """Rebuild connection_suggestion for every connected user. Returns rows written."""
+    adjacency, linked = load_graph()
+    computed_at = datetime.utcnow()
+    db.session.execute(delete(ConnectionSuggestion.__table__))
+    written = 0
+    batch = []
+    for user_id in adjacency:
+        for rank, (candidate_id, count) in enumerate(suggest(adjacency, linked, user_id, top_k), start=1):
+            batch.append({
+                'user_id': user_id,
+                'candidate_id': candidate_id,
+                'mutual_count': count,
+                'rank': rank,
+                'computed_at': computed_at,
+            })
+        if len(batch) >= WRITE_BATCH_SIZE:
+            db.session.execute(insert(ConnectionSuggestion.__table__), batch)
+            written += len(batch)
+            batch = []
+    if batch:
+        db.session.execute(insert(ConnectionSuggestion.__table__), batch)
+        written += len(batch)
+    db.session.commit()
+    logger.info('Stored %d connection suggestions for %d users', written, len(adjacency))
+    return written
+
+
+@click.command('compute-suggestions')
+@click.option('--top-k', default=20, show_default=True, help='Suggestions stored per user.')
+@with_appcontext
+def compute_suggestions_command(top_k):
+    """Precompute "people you may know" for every user."""
+    written = compute_suggestions(top_k)
+    click.echo(f'Stored {written} suggestions')
@@ -0,0 +1,190 @@
+"""Near-duplicate post detection with SimHash.
+
+A post's fingerprint is the 64-bit SimHash of its word bigrams: every
+feature hash votes on each bit, weighted by how often the feature occurs,
+so texts that differ by a few words land a few bits apart. The fingerprint
+is stored in Post.simhash.
+
+To find candidates without scanning, the fingerprint is cut into
+DUPLICATE_BANDS equal bands and each (band, value) pair is indexed in
+post_simhash_band. Two fingerprints within DUPLICATE_HAMMING_THRESHOLD
+bits of each other agree exactly on at least one band whenever the
+threshold is below the band count, so a new post is compared only with
+the posts sharing one of its buckets: one indexed lookup per band.
+
+DUPLICATE_MODE decides what happens to a near-duplicate:
+
+    reject   - create_post answers 409 and nothing is stored
+    flag     - the post is stored with duplicate_of set, for moderation
+    collapse - as flag, and the post is also kept out of listings, timelines
+               and trending tags
+    off      - no check (fingerprints are still recorded)
+"""
+import hashlib
+import logging
+import re
+from collections import Counter
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import and_, insert, or_, select, update, bindparam
+from app.backend.extensions import db
+from app.backend.models.post import Post
+from app.backend.models.simhash import SimhashBand
+
+logger = logging.getLogger(__name__)
+
+FINGERPRINT_BITS = 64
+# post_simhash_band.bucket is a signed 32-bit column
+MAX_BAND_BITS = 31
+MODES = ('off', 'reject', 'flag', 'collapse')
+BACKFILL_BATCH_SIZE = 1000
+
+_word = re.compile(r'\w+')
+
+
+def _features(text):
+    words = _word.findall(text.lower())
+    if len(words) < 2:
+        return Counter(words)
+    return Counter(' '.join(pair) for pair in zip(words, words[1:]))
+
+
+def simhash(text, min_tokens=1):
+    """Unsigned 64-bit SimHash of `text`, or None if it has fewer than `min_tokens` words."""
+    if len(_word.findall(text)) < min_tokens:
+        return None
+    votes = [0] * FINGERPRINT_BITS
+    for feature, weight in _features(text).items():
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'little')
+        for bit in range(FINGERPRINT_BITS):
+            votes[bit] += weight if h >> bit & 1 else -weight
+    return sum(1 << bit for bit, vote in enumerate(votes) if vote > 0)
+
+
+def to_signed(fingerprint):
+    """Fit an unsigned fingerprint in a signed BIGINT column."""
+    return fingerprint - (1 << 64) if fingerprint >= 1 << 63 else fingerprint
+
+
+def to_unsigned(value):
+    return value + (1 << 64) if value < 0 else value
+
+
+def hamming(a, b):
+    return bin(a ^ b).count('1')
+
+
+def bands(fingerprint, count):
+    """[(band, bucket)] for an unsigned fingerprint split into `count` bands."""
+    width = FINGERPRINT_BITS // count
+    mask = (1 << width) - 1
+    return [(band, fingerprint >> (band * width) & mask) for band in range(count)]
+
+
+def init_app(app):
+    # Band width is FINGERPRINT_BITS // count, from 1 to MAX_BAND_BITS bits
+    lowest = FINGERPRINT_BITS // MAX_BAND_BITS + 1
+    count = app.config.get('DUPLICATE_BANDS', 4)
+    if not lowest <= count <= FINGERPRINT_BITS:
+        raise ValueError(f'DUPLICATE_BANDS must be between {lowest} and {FINGERPRINT_BITS}')
+    # Fewer differing bits than bands leaves at least one band identical
+    if app.config.get('DUPLICATE_HAMMING_THRESHOLD', 3) >= count:
+        raise ValueError('DUPLICATE_HAMMING_THRESHOLD must be lower than DUPLICATE_BANDS')
+
+
+def _settings():
+    config = current_app.config
+    return {
+        'mode': config.get('DUPLICATE_MODE', 'flag'),
+        'threshold': config.get('DUPLICATE_HAMMING_THRESHOLD', 3),
+        'bands': config.get('DUPLICATE_BANDS', 4),
+        'min_tokens': config.get('DUPLICATE_MIN_TOKENS', 5),
+        'max_candidates': config.get('DUPLICATE_MAX_CANDIDATES', 500),
+    }
+
+
+def fingerprint(text):
+    return simhash(text, _settings()['min_tokens'])
+
+
+def find_near_duplicate(fingerprint):
+    """(post_id, distance) of the closest stored post within the threshold, or None."""
+    settings = _settings()
+    if fingerprint is None:
+        return None
+    buckets = or_(*[
+        and_(SimhashBand.band == band, SimhashBand.bucket == bucket)
+        for band, bucket in bands(fingerprint, settings['bands'])
+    ])
+    candidates = db.session.execute(
+        select(Post.id, Post.simhash).join(SimhashBand, SimhashBand.post_id == Post.id)
+        .where(buckets).distinct().order_by(Post.id.desc()).limit(settings['max_candidates'])
+    )
+    best = None
+    for post_id, value in candidates:
+        distance = hamming(fingerprint, to_unsigned(value))
+        if distance <= settings['threshold'] and (best is None or distance < best[1]):
+            best = (post_id, distance)
+    return best
+
+
+def check_duplicate(text):
+    """(fingerprint, duplicate_of, action) for the text of a new post.
+
+    `action` is None when the text is not a near-duplicate (or checking is
+    off), otherwise the configured DUPLICATE_MODE.
+    """
+    value = fingerprint(text)
+    mode = _settings()['mode']
+    if mode not in MODES:
+        logger.warning('Unknown DUPLICATE_MODE %r, treating as flag', mode)
+        mode = 'flag'
+    match = find_near_duplicate(value) if mode != 'off' else None
+    if match is None:
+        return value, None, None
+    return value, match[0], mode
+
+
+def index_posts(fingerprints):
+    """Add band rows for {post_id: unsigned fingerprint}; the caller commits."""
+    count = _settings()['bands']
+    rows = [
+        {'band': band, 'bucket': bucket, 'post_id': post_id}
+        for post_id, value in fingerprints.items() if value is not None
+        for band, bucket in bands(value, count)
+    ]
+    if rows:
+        db.session.execute(insert(SimhashBand.__table__), rows)
+
+
+def backfill(batch_size=BACKFILL_BATCH_SIZE):
+    """Fingerprint and index posts stored before detection existed. Returns posts indexed."""
+    post = Post.__table__
+    stmt = update(post).where(post.c.id == bindparam('post_id')).values(simhash=bindparam('value'))
+    indexed = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            select(post.c.id, post.c.content).where(post.c.simhash.is_(None), post.c.id > last_id)
+            .order_by(post.c.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        fingerprints = {row.id: fingerprint(row.content or '') for row in rows}
+        fingerprints = {k: v for k, v in fingerprints.items() if v is not None}
+        if fingerprints:
+            db.session.execute(stmt, [{'post_id': k, 'value': to_signed(v)} for k, v in fingerprints.items()])
+            index_posts(fingerprints)
+        db.session.commit()
+        indexed += len(fingerprints)
+    return indexed
+
+
+@click.command('index-simhash')
+@with_appcontext
+def index_simhash_command():
+    """Fingerprint existing posts for near-duplicate detection."""
+    indexed = backfill()
+    click.echo(f'Indexed {indexed} posts')
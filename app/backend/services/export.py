@@ -0,0 +1,73 @@
+"""Streaming NDJSON export of a user's profile, posts and comments.
+
+Rows are read with ``yield_per`` (a server-side cursor where the driver
+supports one) as plain Core rows, so nothing accumulates in the session and
+memory stays flat however many posts the user has. Posts and comments moved
+to the archive (services/archive.py) follow the live ones, month by month.
+Each record is one JSON line tagged with its ``type``; output can be
+gzip-compressed as it streams.
+"""
+import zlib
+import click
+from flask.cli import with_appcontext
+from sqlalchemy import select
+from app.backend.extensions import db
+from app.backend.models.post import Post
+from app.backend.models.comment import Comment
+from app.backend.models.profile import Profile
+from app.backend.services.archive import post_month_tables
+from app.backend.services.serialization import dumps
+
+EXPORT_BATCH_SIZE = 500
+
+PROFILE_COLUMNS = (
+    'first_name', 'last_name', 'bio', 'location', 'website', 'skills', 'experience',
+    'education', 'image', 'job_title', 'company', 'social_links'
+)
+POST_COLUMNS = ('id', 'content', 'media_url', 'likes', 'tags', 'category', 'visibility', 'created_at')
+COMMENT_COLUMNS = ('id', 'post_id', 'content', 'created_at')
+
+
+def _stream(table, columns, *criteria):
+    stmt = select(*[table.c[name] for name in columns]).where(*criteria).order_by(table.c.id)
+    result = db.session.execute(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+    for row in result:
+        yield dict(row._mapping)
+
+
+def iter_user_records(user_id):
+    """Yield the user's data as dicts, one per exported record."""
+    for row in _stream(Profile.__table__, PROFILE_COLUMNS, Profile.__table__.c.user_id == user_id):
+        yield dict(row, type='profile', user_id=user_id)
+    for table in [Post.__table__, *post_month_tables(Post)]:
+        for row in _stream(table, POST_COLUMNS, table.c.user_id == user_id):
+            row['tags'] = row['tags'].split(',') if row['tags'] else []
+            yield dict(row, type='post')
+    for table in [Comment.__table__, *post_month_tables(Comment)]:
+        for row in _stream(table, COMMENT_COLUMNS, table.c.user_id == user_id):
+            yield dict(row, type='comment')
+
+
+def iter_ndjson(records, compress=False):
+    """Encode records as NDJSON byte chunks, optionally gzip-compressed."""
+    if not compress:
+        for record in records:
+            yield dumps(record) + b'\n'
+        return
+    gzip = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits=31 writes a gzip container
+    for record in records:
+        chunk = gzip.compress(dumps(record) + b'\n')
+        if chunk:
+            yield chunk
+    yield gzip.flush()
+
+
+@click.command('export-user')
+@click.argument('user_id', type=int)
+@click.option('--output', '-o', type=click.File('wb'), default='-', help='Destination file (default stdout).')
+@click.option('--gzip', 'compress', is_flag=True, help='Gzip the output.')
+@with_appcontext
+def export_user_command(user_id, output, compress):
+    """Export a user's profile, posts and comments as NDJSON."""
+    for chunk in iter_ndjson(iter_user_records(user_id), compress):
+        output.write(chunk)
@@ -0,0 +1,253 @@
+"""Job search with company and location facets.
+
+Keyword search over title and description follows services/search.py: an
+FTS5 table on SQLite, a FULLTEXT index on MySQL and a generated tsvector
+column with a GIN index on PostgreSQL. Any other database falls back to a
+LIKE scan. Every token must match, the last one also as a prefix.
+
+Facet counts are read from ``job_facet_count``, one row per (company,
+location) pair, which mapper events keep up to date in the same transaction
+as each job insert, update or delete. Counts for each facet apply the other
+facet's filter (picking a company narrows the location counts, not the
+company list), so a count is a SUM over the pairs table, which is far
+smaller than the job table. With a keyword, counts are grouped over the
+matching jobs only.
+
+Facet results are cached under a generation number that is bumped after
+any commit touching a job. The generation lives in the cache, so with a
+shared backend (sqlite or redis, see services/cache.py) every worker drops
+its cached counts on commit; with the default per-worker memory cache only
+the committing worker does, and the others can serve counts up to
+JOB_FACET_TTL seconds old.
+"""
+import hashlib
+import json
+import time
+from flask import current_app
+from sqlalchemy import DDL, desc, event, func, inspect, insert, literal_column, or_, select, table, column, text, update
+from sqlalchemy.dialects.mysql import match as mysql_match
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import object_session
+from app.backend.extensions import db, cache
+from app.backend.models.job import Job, JobFacetCount
+from app.backend.services.search import tokenize
+
+FACETS = ('company', 'location')
+FACET_GENERATION_KEY = 'jobs:facets:generation'
+
+
+class JobSearchBackend:
+    name = 'like'
+
+    def apply(self, query, term):
+        """Filter `query` to jobs whose title or description matches `term`."""
+        pattern = f'%{term}%'
+        return query.filter(or_(Job.title.ilike(pattern), Job.description.ilike(pattern)))
+
+    def index_job(self, connection, job):
+        pass
+
+    def remove_job(self, connection, job_id):
+        pass
+
+
+class SQLiteFTS5JobSearch(JobSearchBackend):
+    name = 'sqlite'
+    fts = table('job_fts', column('rowid'), column('job_fts'))
+
+    def apply(self, query, term):
+        tokens = tokenize(term)
+        if not tokens:
+            return super().apply(query, term)
+        match = ' '.join(f'"{t}"' for t in tokens[:-1])
+        match = f'{match} "{tokens[-1]}"*'.strip()
+        hits = select(self.fts.c.rowid.label('job_id')).where(self.fts.c.job_fts.op('MATCH')(match)).subquery()
+        return query.join(hits, hits.c.job_id == Job.id)
+
+    def index_job(self, connection, job):
+        self.remove_job(connection, job.id)
+        connection.execute(
+            text('INSERT INTO job_fts(rowid, title, description) VALUES (:id, :title, :description)'),
+            {'id': job.id, 'title': job.title or '', 'description': job.description or ''}
+        )
+
+    def remove_job(self, connection, job_id):
+        connection.execute(text('DELETE FROM job_fts WHERE rowid = :id'), {'id': job_id})
+
+
+class MySQLFulltextJobSearch(JobSearchBackend):
+    name = 'mysql'
+
+    def apply(self, query, term):
+        tokens = tokenize(term)
+        if not tokens:
+            return super().apply(query, term)
+        against = ' '.join(f'+{t}' for t in tokens[:-1])
+        against = f'{against} +{tokens[-1]}*'.strip()
+        return query.filter(mysql_match(Job.title, Job.description, against=against).in_boolean_mode() > 0)
+
+
+class PostgresTsvectorJobSearch(JobSearchBackend):
+    name = 'postgresql'
+
+    def apply(self, query, term):
+        tokens = tokenize(term)
+        if not tokens:
+            return super().apply(query, term)
+        tsquery = func.to_tsquery('english', ' & '.join(f'{t}:*' for t in tokens))
+        return query.filter(literal_column('job.search_vector').op('@@')(tsquery))
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTS5JobSearch,
+    'mysql': MySQLFulltextJobSearch,
+    'postgresql': PostgresTsvectorJobSearch,
+}
+
+
+def backend_for_uri(uri):
+    return BACKENDS.get(make_url(uri).get_backend_name(), JobSearchBackend)()
+
+
+def init_app(app):
+    app.extensions['job_search'] = backend_for_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+
+
+def get_backend():
+    backend = current_app.extensions.get('job_search')
+    if backend is None:
+        backend = backend_for_uri(current_app.config['SQLALCHEMY_DATABASE_URI'])
+        current_app.extensions['job_search'] = backend
+    return backend
+
+
+def search_jobs(query, term):
+    return get_backend().apply(query, term)
+
+
+def _other_filters(facet, companies, locations):
+    """(column name, values) filters for `facet`'s counts: every selection but its own."""
+    selected = {'company': companies, 'location': locations}
+    return [(name, values) for name, values in selected.items() if name != facet and values]
+
+
+def _pair_counts(facet, companies, locations, limit):
+    pairs = JobFacetCount.__table__
+    total = func.sum(pairs.c.count)
+    stmt = select(pairs.c[facet], total).where(pairs.c.count > 0)
+    for name, values in _other_filters(facet, companies, locations):
+        stmt = stmt.where(pairs.c[name].in_(values))
+    stmt = stmt.group_by(pairs.c[facet]).order_by(desc(total), pairs.c[facet]).limit(limit)
+    return db.session.execute(stmt).all()
+
+
+def _search_counts(facet, companies, locations, term, limit):
+    value = getattr(Job, facet)
+    total = func.count(Job.id)
+    query = search_jobs(db.session.query(value, total), term)
+    for name, values in _other_filters(facet, companies, locations):
+        query = query.filter(getattr(Job, name).in_(values))
+    return query.group_by(value).order_by(desc(total), value).limit(limit).all()
+
+
+def facet_counts(companies=(), locations=(), term=None):
+    """{facet: [{'value', 'count'}, ...]} for the jobs matching the filters, largest first."""
+    companies, locations = sorted(set(companies)), sorted(set(locations))
+    # Jobs without a location are filed under '' in job_facet_count
+    pair_locations = [location or '' for location in locations]
+    term = ' '.join(tokenize(term)) if term else ''
+    config = current_app.config
+    limit = config.get('JOB_FACET_LIMIT', 20)
+    generation = cache.get(FACET_GENERATION_KEY, 0)
+    digest = hashlib.blake2b(json.dumps([companies, locations, term, limit]).encode(), digest_size=12).hexdigest()
+    cache_key = f'jobs:facets:{generation}:{digest}'
+    facets = cache.get(cache_key)
+    if facets is None:
+        facets = {}
+        for facet in FACETS:
+            if term:
+                rows = _search_counts(facet, companies, locations, term, limit)
+            else:
+                rows = _pair_counts(facet, companies, pair_locations, limit)
+            facets[facet] = [{'value': value or None, 'count': int(count)} for value, count in rows]
+        cache.set(cache_key, facets, config.get('JOB_FACET_TTL', 300))
+    return facets
+
+
+def _bump(connection, company, location, delta):
+    pairs = JobFacetCount.__table__
+    key = (pairs.c.company == company) & (pairs.c.location == (location or ''))
+    bump = update(pairs).where(key).values(count=pairs.c.count + delta)
+    if connection.execute(bump).rowcount or delta < 0:
+        return
+    try:
+        with connection.begin_nested():
+            connection.execute(insert(pairs).values(company=company, location=location or '', count=delta))
+    except IntegrityError:
+        # A concurrent transaction created the pair first
+        connection.execute(bump)
+
+
+def _mark_facets_stale(target):
+    object_session(target).info['job_facets_stale'] = True
+
+
+# Keep job_facet_count and the search index in step with the job table
+@event.listens_for(Job, 'after_insert')
+def _job_inserted(mapper, connection, target):
+    _bump(connection, target.company, target.location, 1)
+    get_backend().index_job(connection, target)
+    _mark_facets_stale(target)
+
+
+@event.listens_for(Job, 'after_update')
+def _job_updated(mapper, connection, target):
+    state = inspect(target)
+    company, location = state.attrs.company.history, state.attrs.location.history
+    if company.has_changes() or location.has_changes():
+        old_company = company.deleted[0] if company.deleted else target.company
+        old_location = location.deleted[0] if location.deleted else target.location
+        _bump(connection, old_company, old_location, -1)
+        _bump(connection, target.company, target.location, 1)
+        _mark_facets_stale(target)
+    if state.attrs.title.history.has_changes() or state.attrs.description.history.has_changes():
+        get_backend().index_job(connection, target)
+
+
+@event.listens_for(Job, 'after_delete')
+def _job_deleted(mapper, connection, target):
+    _bump(connection, target.company, target.location, -1)
+    get_backend().remove_job(connection, target.id)
+    _mark_facets_stale(target)
+
+
+@event.listens_for(db.session, 'after_commit')
+def _invalidate_job_facets(session):
+    if session.info.pop('job_facets_stale', False):
+        # A new generation orphans every cached facet result; they expire on their own
+        cache.set(FACET_GENERATION_KEY, time.time_ns(), 0)
+
+
+@event.listens_for(db.session, 'after_rollback')
+def _discard_job_facets_flag(session):
+    session.info.pop('job_facets_stale', None)
+
+
+# db.create_all() builds the same structures the migration does
+event.listen(Job.__table__, 'after_create', DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS job_fts USING fts5(title, description, prefix='2 3')"
+).execute_if(dialect='sqlite'))
+event.listen(Job.__table__, 'before_drop', DDL(
+    'DROP TABLE IF EXISTS job_fts'
+).execute_if(dialect='sqlite'))
+event.listen(Job.__table__, 'after_create', DDL(
+    'CREATE FULLTEXT INDEX ix_job_title_description_fulltext ON job (title, description)'
+).execute_if(dialect='mysql'))
+event.listen(Job.__table__, 'after_create', DDL(
+    "ALTER TABLE job ADD COLUMN search_vector tsvector GENERATED ALWAYS AS "
+    "(to_tsvector('english', coalesce(title, '') || ' ' || coalesce(description, ''))) STORED"
+).execute_if(dialect='postgresql'))
+event.listen(Job.__table__, 'after_create', DDL(
+    'CREATE INDEX ix_job_search_vector ON job USING GIN (search_vector)'
+).execute_if(dialect='postgresql'))
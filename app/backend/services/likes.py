@@ -0,0 +1,36 @@
+"""Write-behind aggregation of post like counts.
+
+like_post records the (user, post) pair right away, which is what enforces
+one like per user, but the Post.likes counter is only bumped in memory.
+The buffer is flushed with one batched ``UPDATE post SET likes = likes + n``
+per interval or once enough posts are pending. Reads add the pending delta
+through pending_likes so counts stay correct in between.
+"""
+from sqlalchemy import bindparam, func, update
+from app.backend.extensions import db
+from app.backend.models.post import Post
+from app.backend.services.buffer import CounterBuffer
+
+
+def flush_likes(deltas):
+    post = Post.__table__
+    stmt = update(post).where(post.c.id == bindparam('post_id')).values(
+        likes=func.coalesce(post.c.likes, 0) + bindparam('delta')
+    )
+    db.session.execute(stmt, [{'post_id': k, 'delta': v} for k, v in deltas.items()])
+    db.session.commit()
+
+
+like_counter = CounterBuffer('like_counter', flush_likes)
+
+
+def init_app(app):
+    like_counter.init_app(
+        app,
+        interval=app.config.get('LIKE_FLUSH_INTERVAL'),
+        threshold=app.config.get('LIKE_FLUSH_THRESHOLD')
+    )
+
+
+def pending_likes(post_ids):
+    return like_counter.pending_many(post_ids)
@@ -0,0 +1,57 @@
+"""Conversations and message delivery.
+
+Each pair of users has one conversation row. Sending a message inserts it
+and, in the same transaction, moves the conversation's last_message_id and
+last_sent_at forward (an UPDATE guarded by last_message_id in its WHERE
+clause, so a slower, older send never overwrites a newer one) and bumps the
+receiver's unread counter, so the inbox never has to group the message table.
+"""
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from app.backend.extensions import db
+from app.backend.models.conversation import Conversation
+from app.backend.models.message import Message
+
+
+def conversation_between(user_id, other_id, create=True):
+    user_a_id, user_b_id = Conversation.pair(user_id, other_id)
+    conversation = Conversation.query.filter_by(user_a_id=user_a_id, user_b_id=user_b_id).first()
+    if conversation is None and create:
+        conversation = Conversation(user_a_id=user_a_id, user_b_id=user_b_id)
+        db.session.add(conversation)
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Created concurrently by the other participant
+            db.session.rollback()
+            conversation = Conversation.query.filter_by(user_a_id=user_a_id, user_b_id=user_b_id).one()
+    return conversation
+
+
+def send_message(conversation, sender_id, content):
+    receiver_id = conversation.other_participant(sender_id)
+    message = Message(
+        conversation_id=conversation.id, sender_id=sender_id, receiver_id=receiver_id,
+        content=content, sent_at=datetime.utcnow()
+    )
+    db.session.add(message)
+    db.session.flush()
+    # The guard stays out of SET: MySQL assigns left to right, so a CASE on
+    # last_message_id after it was set would see the new value
+    newer = (Conversation.last_message_id.is_(None)) | (Conversation.last_message_id < message.id)
+    db.session.execute(
+        update(Conversation).where(Conversation.id == conversation.id, newer)
+        .values(last_message_id=message.id, last_sent_at=message.sent_at)
+    )
+    unread = Conversation.unread_b if receiver_id == conversation.user_b_id else Conversation.unread_a
+    db.session.execute(update(Conversation).where(Conversation.id == conversation.id).values({unread: unread + 1}))
+    db.session.commit()
+    return message
+
+
+def mark_read(conversation, user_id):
+    unread = Conversation.unread_a if user_id == conversation.user_a_id else Conversation.unread_b
+    db.session.execute(update(Conversation).where(Conversation.id == conversation.id).values({unread: 0}))
+    db.session.commit()
+
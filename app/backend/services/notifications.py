@@ -0,0 +1,135 @@
+"""Coalesced like and comment notifications.
+
+notify() only records the event in a CounterBuffer keyed by
+(recipient, post, type, actor). Each flush groups the buffered events by
+(recipient, post, type) and merges every group into the recipient's unread
+notification for the same post, type and NOTIFICATION_WINDOW, so a viral
+post produces one row per window ("12 people liked your post") rather than
+one per like. Existing groups are updated and new ones inserted with one
+batched statement each, and each recipient then gets a push event.
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import bindparam, insert, select, tuple_, update
+from app.backend.extensions import db
+from app.backend.models.notification import Notification
+from app.backend.services.buffer import CounterBuffer
+from app.backend.services.push import hub
+
+EPOCH = datetime(1970, 1, 1)
+MAX_ACTORS = 3
+
+VERBS = {'like': 'liked your post', 'comment': 'commented on your post'}
+
+
+def window_start(now, window):
+    """Start of the `window`-second bucket holding naive UTC `now`."""
+    seconds = int((now - EPOCH).total_seconds())
+    return EPOCH + timedelta(seconds=seconds - seconds % window)
+
+
+def _merge_actors(new_ids, stored):
+    actors = list(new_ids)
+    for actor_id in (int(a) for a in stored.split(',')) if stored else ():
+        if actor_id not in actors:
+            actors.append(actor_id)
+    return ','.join(str(a) for a in actors[:MAX_ACTORS])
+
+
+def flush_notifications(deltas):
+    """Merge buffered {(recipient, post, type, actor): events} into notification groups."""
+    groups = defaultdict(lambda: {'count': 0, 'actors': []})
+    # Later events come later in the buffer; keep the latest actors first
+    for (recipient_id, post_id, kind, actor_id), events in reversed(list(deltas.items())):
+        group = groups[(recipient_id, post_id, kind)]
+        group['count'] += events
+        if actor_id not in group['actors']:
+            group['actors'].append(actor_id)
+    pushed = [(key, group['count']) for key, group in groups.items()]
+    now = datetime.utcnow()
+    start = window_start(now, current_app.config.get('NOTIFICATION_WINDOW', 3600))
+    table = Notification.__table__
+    existing = db.session.execute(
+        select(table.c.id, table.c.recipient_id, table.c.post_id, table.c.type, table.c.actor_ids).where(
+            tuple_(table.c.recipient_id, table.c.post_id, table.c.type).in_(list(groups)),
+            table.c.window_start == start,
+            table.c.read.is_(False)
+        ).with_for_update()
+    ).all()
+    updates = []
+    for row in existing:
+        group = groups.pop((row.recipient_id, row.post_id, row.type), None)
+        if group is None:
+            continue
+        updates.append({
+            'notification_id': row.id,
+            'added': group['count'],
+            'actors': _merge_actors(group['actors'], row.actor_ids),
+            'now': now,
+        })
+    if updates:
+        stmt = update(table).where(table.c.id == bindparam('notification_id')).values(
+            count=table.c.count + bindparam('added'),
+            actor_ids=bindparam('actors'),
+            updated_at=bindparam('now'),
+        )
+        db.session.execute(stmt, updates)
+    if groups:
+        db.session.execute(insert(table), [
+            {
+                'recipient_id': recipient_id, 'post_id': post_id, 'type': kind,
+                'count': group['count'], 'actor_ids': _merge_actors(group['actors'], None),
+                'window_start': start, 'read': False, 'created_at': now, 'updated_at': now,
+            }
+            for (recipient_id, post_id, kind), group in groups.items()
+        ])
+    db.session.commit()
+    for (recipient_id, post_id, kind), added in pushed:
+        hub.publish((recipient_id,), 'notification', {'type': kind, 'post_id': post_id, 'added': added})
+
+
+notification_buffer = CounterBuffer('notification_buffer', flush_notifications, interval=5.0, threshold=500)
+
+
+def init_app(app):
+    notification_buffer.init_app(
+        app,
+        interval=app.config.get('NOTIFICATION_FLUSH_INTERVAL'),
+        threshold=app.config.get('NOTIFICATION_FLUSH_THRESHOLD')
+    )
+
+
+def notify(recipient_id, post_id, kind, actor_id):
+    """Queue a `kind` ('like' or 'comment') event on `post_id` for its author."""
+    if recipient_id is None or int(recipient_id) == int(actor_id):
+        return
+    notification_buffer.add((int(recipient_id), post_id, kind, int(actor_id)))
+
+
+def unread_count(user_id):
+    return Notification.query.filter_by(recipient_id=user_id, read=False).count()
+
+
+def _join_names(names):
+    return f"{', '.join(names[:-1])} and {names[-1]}" if len(names) > 1 else names[0]
+
+
+def summary(kind, count, actor_names):
+    """e.g. "alice, bob and 10 others liked your post".
+
+    `count` is events, not people. That is one per person for likes, which
+    are deduplicated per user, but one user may comment many times, so
+    grouped comments are worded by comment count with the latest commenters.
+    """
+    names = [n for n in actor_names if n]
+    verb = VERBS.get(kind, kind)
+    if kind == 'comment' and count > 1:
+        latest = f', latest from {_join_names(names)}' if names else ''
+        return f'{count} new comments on your post{latest}'
+    if not names:
+        return f'{count} people {verb}' if count > 1 else f'Someone {verb}'
+    others = count - len(names)
+    if others > 0:
+        return f"{', '.join(names)} and {others} other{'s' if others > 1 else ''} {verb}"
+    return f'{_join_names(names)} {verb}'
@@ -0,0 +1,239 @@
+"""Online presence from expiring heartbeats.
+
+Clients call POST /presence/heartbeat every PRESENCE_TTL / 2 seconds or so;
+a user is online while their last heartbeat is younger than PRESENCE_TTL.
+Heartbeats never write to the database: they go to a presence store picked
+with PRESENCE_BACKEND:
+
+- ``sqlite`` (default): a local SQLite file (PRESENCE_URL is the path)
+  shared by every worker on the host.
+- ``memory``: a dict plus a min-heap of expiry times in the current
+  process. Expired users are popped off the heap lazily, so a heartbeat
+  and an expiry sweep are O(log n). Only for single-process deployments:
+  each worker would otherwise see just the heartbeats it served.
+- ``redis``: a sorted set of last-seen times (PRESENCE_URL is the redis://
+  URL). Requires the ``redis`` package.
+
+User.last_seen_at is persisted lazily: each process remembers the latest
+heartbeat per user, and a daemon thread writes them in one batched UPDATE
+every PRESENCE_PERSIST_INTERVAL seconds, plus once more at exit. A failed
+write keeps the heartbeats for the next run.
+"""
+import atexit
+import heapq
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime
+from sqlalchemy import bindparam, or_, update
+from app.backend.extensions import db
+from app.backend.models.user import User
+
+try:
+    import redis
+except ImportError:  # optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# How often backends drop expired entries, in seconds
+PRUNE_INTERVAL = 30
+
+
+class MemoryPresence:
+    def __init__(self, url=None):
+        self._last_seen = {}
+        self._expiry = []
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        heap = self._expiry
+        while heap and heap[0][0] <= now:
+            expires_at, user_id, ttl = heapq.heappop(heap)
+            # Later heartbeats pushed newer entries; only the newest one removes the user
+            last_seen = self._last_seen.get(user_id)
+            if last_seen is not None and last_seen + ttl <= now:
+                del self._last_seen[user_id]
+
+    def touch(self, user_id, now, ttl):
+        with self._lock:
+            self._last_seen[user_id] = now
+            heapq.heappush(self._expiry, (now + ttl, user_id, ttl))
+            self._expire(now)
+
+    def online(self, user_ids, now, ttl):
+        with self._lock:
+            self._expire(now)
+            seen = self._last_seen
+            return {u: seen[u] for u in user_ids if u in seen and seen[u] + ttl > now}
+
+
+class SQLitePresence:
+    def __init__(self, url=None):
+        self.path = url or os.path.join(tempfile.gettempdir(), 'zara-presence.sqlite3')
+        self._local = threading.local()
+        self._last_prune = 0.0
+        conn = self._conn()
+        conn.execute('CREATE TABLE IF NOT EXISTS presence (user_id INTEGER PRIMARY KEY, last_seen REAL NOT NULL, expires_at REAL NOT NULL)')
+        conn.execute('CREATE INDEX IF NOT EXISTS ix_presence_expires_at ON presence (expires_at)')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def touch(self, user_id, now, ttl):
+        conn = self._conn()
+        conn.execute(
+            'INSERT OR REPLACE INTO presence (user_id, last_seen, expires_at) VALUES (?, ?, ?)',
+            (user_id, now, now + ttl)
+        )
+        if now - self._last_prune > PRUNE_INTERVAL:
+            self._last_prune = now
+            conn.execute('DELETE FROM presence WHERE expires_at <= ?', (now,))
+
+    def online(self, user_ids, now, ttl):
+        if not user_ids:
+            return {}
+        placeholders = ','.join('?' * len(user_ids))
+        rows = self._conn().execute(
+            f'SELECT user_id, last_seen FROM presence WHERE user_id IN ({placeholders}) AND expires_at > ?',
+            (*user_ids, now)
+        )
+        return dict(rows.fetchall())
+
+
+class RedisPresence:
+    key = 'zara:presence'
+
+    def __init__(self, url=None):
+        if redis is None:
+            raise RuntimeError('PRESENCE_BACKEND=redis requires the redis package')
+        self._client = redis.Redis.from_url(url or 'redis://localhost:6379/0')
+        self._last_prune = 0.0
+
+    def touch(self, user_id, now, ttl):
+        pipe = self._client.pipeline(transaction=False)
+        pipe.zadd(self.key, {user_id: now})
+        if now - self._last_prune > PRUNE_INTERVAL:
+            self._last_prune = now
+            pipe.zremrangebyscore(self.key, '-inf', now - ttl)
+        pipe.execute()
+
+    def online(self, user_ids, now, ttl):
+        if not user_ids:
+            return {}
+        scores = self._client.zmscore(self.key, list(user_ids))
+        return {u: s for u, s in zip(user_ids, scores) if s is not None and s + ttl > now}
+
+
+BACKENDS = {
+    'memory': MemoryPresence,
+    'sqlite': SQLitePresence,
+    'redis': RedisPresence,
+}
+
+
+class Presence:
+    def __init__(self, app=None):
+        self.store = MemoryPresence()
+        self.ttl = 60
+        self.persist_interval = 300
+        self.app = None
+        self._dirty = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('PRESENCE_BACKEND', 'sqlite')
+        if backend not in BACKENDS:
+            raise ValueError(f'Unknown PRESENCE_BACKEND {backend!r}')
+        self.store = BACKENDS[backend](app.config.get('PRESENCE_URL'))
+        self.ttl = app.config.get('PRESENCE_TTL', self.ttl)
+        self.persist_interval = app.config.get('PRESENCE_PERSIST_INTERVAL', self.persist_interval)
+        self.app = app
+        app.extensions['presence'] = self
+        atexit.register(self.persist)
+
+    def heartbeat(self, user_id, now=None):
+        """Mark `user_id` online for the next `ttl` seconds."""
+        now = time.time() if now is None else now
+        self.store.touch(user_id, now, self.ttl)
+        with self._lock:
+            self._dirty[user_id] = now
+        self._ensure_thread()
+
+    def online(self, user_ids, now=None):
+        """{user_id: last heartbeat (unix seconds)} for the users in `user_ids` who are online."""
+        now = time.time() if now is None else now
+        return self.store.online(list(dict.fromkeys(user_ids)), now, self.ttl)
+
+    def persist(self):
+        """Write buffered heartbeats to User.last_seen_at in one batched UPDATE.
+
+        On failure the heartbeats go back into the buffer for the next run.
+        """
+        with self._lock:
+            dirty, self._dirty = self._dirty, {}
+        if not dirty:
+            return 0
+        try:
+            if self.app is not None:
+                with self.app.app_context():
+                    self._write(dirty)
+            else:
+                self._write(dirty)
+        except Exception:
+            logger.exception('Persisting last-seen times failed, keeping %d users for retry', len(dirty))
+            with self._lock:
+                for user_id, ts in dirty.items():
+                    if ts > self._dirty.get(user_id, 0):
+                        self._dirty[user_id] = ts
+            return 0
+        return len(dirty)
+
+    def _write(self, dirty):
+        table = User.__table__
+        stmt = update(table).where(
+            table.c.id == bindparam('user_id'),
+            or_(table.c.last_seen_at.is_(None), table.c.last_seen_at < bindparam('seen'))
+        ).values(last_seen_at=bindparam('seen'))
+        try:
+            db.session.execute(stmt, [
+                {'user_id': user_id, 'seen': datetime.utcfromtimestamp(ts)} for user_id, ts in dirty.items()
+            ])
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def _ensure_thread(self):
+        # Started lazily so the thread is created after gunicorn forks
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(target=self._run, name='presence-persister', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while True:
+            time.sleep(self.persist_interval)
+            self.persist()
+
+
+presence = Presence()
+
+
+def init_app(app):
+    presence.init_app(app)
@@ -0,0 +1,292 @@
+"""Real-time push of messages and notifications to connected users.
+
+Clients hold a Server-Sent Events stream (GET /push/stream) or long-poll
+(GET /push/poll). Publishers call hub.publish(user_ids, type, data); the
+event travels over a bus to every process, and each process's hub hands it
+to the queues of its local subscribers for those users. A connection costs
+one queue, never a bus connection, so an async worker (gevent, see
+gunicorn.push.conf.py) can hold thousands of idle streams per process.
+
+The bus is chosen with PUSH_BACKEND:
+
+- ``memory``: in-process only. Publishers and streams must share the
+  process: the dev server, a single worker, or tests.
+- ``sqlite``: processes on one host share a SQLite file (PUSH_URL is the
+  path), polled every PUSH_POLL_INTERVAL seconds.
+- ``redis``: Redis pub/sub (PUSH_URL is the redis:// URL), any number of
+  hosts. Requires the ``redis`` package.
+
+The bus numbers events (a timestamp counter in memory, the push_event row
+id on SQLite, an INCR in the same Lua script as the PUBLISH on Redis), so
+every process sees one increasing id sequence and a client can skip what it
+has already seen by id alone.
+
+Events are wake-up hints, not the record: each process keeps the last
+PUSH_REPLAY_SIZE events of users subscribed to it within the last
+PUSH_REPLAY_SECONDS, so a reconnecting stream or the next long-poll can
+resume from its last event id. /sync and /notifications remain the source
+of truth.
+"""
+import json
+import logging
+import os
+import queue
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from app.backend.services.serialization import dumps
+
+try:
+    import redis
+except ImportError:  # optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+# Published events older than this are deleted from the SQLite bus
+SQLITE_RETENTION = 60
+
+
+class MemoryBus:
+    def __init__(self, dispatch, url=None, poll_interval=None):
+        self.dispatch = dispatch
+        self._lock = threading.Lock()
+        self._last_id = 0
+
+    def start(self):
+        pass
+
+    def publish(self, raw):
+        # Microsecond timestamps, so ids keep growing across restarts; assigned
+        # and dispatched under one lock so they arrive in id order
+        with self._lock:
+            self._last_id = max(self._last_id + 1, time.time_ns() // 1000)
+            self.dispatch(self._last_id, raw)
+
+
+class SQLiteBus:
+    def __init__(self, dispatch, url=None, poll_interval=0.2):
+        self.dispatch = dispatch
+        self.path = url or os.path.join(tempfile.gettempdir(), 'zara-push.sqlite3')
+        self.poll_interval = poll_interval or 0.2
+        self._local = threading.local()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._conn().execute(
+            'CREATE TABLE IF NOT EXISTS push_event '
+            '(id INTEGER PRIMARY KEY AUTOINCREMENT, payload BLOB NOT NULL, created_at REAL NOT NULL)'
+        )
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            last_id = self._conn().execute('SELECT COALESCE(MAX(id), 0) FROM push_event').fetchone()[0]
+            self._thread = threading.Thread(target=self._run, args=(last_id,), name='push-sqlite-bus', daemon=True)
+            self._thread.start()
+
+    def _run(self, last_id):
+        last_prune = time.time()
+        while True:
+            try:
+                conn = self._conn()
+                for row_id, raw in conn.execute('SELECT id, payload FROM push_event WHERE id > ? ORDER BY id', (last_id,)):
+                    last_id = row_id
+                    self.dispatch(row_id, raw)
+                if time.time() - last_prune > SQLITE_RETENTION:
+                    conn.execute('DELETE FROM push_event WHERE created_at < ?', (time.time() - SQLITE_RETENTION,))
+                    last_prune = time.time()
+            except Exception:
+                logger.exception('Reading the push bus failed')
+            time.sleep(self.poll_interval)
+
+    def publish(self, raw):
+        self._conn().execute(
+            'INSERT INTO push_event (payload, created_at) VALUES (?, ?)', (sqlite3.Binary(raw), time.time())
+        )
+
+
+class RedisBus:
+    channel = 'zara:push'
+    id_key = 'zara:push:id'
+    # Numbering and publishing in one script keeps ids in publish order
+    PUBLISH_SCRIPT = """
+    local id = redis.call('INCR', KEYS[1])
+    redis.call('PUBLISH', ARGV[1], id .. ':' .. ARGV[2])
+    return id
+    """
+
+    def __init__(self, dispatch, url=None, poll_interval=None):
+        if redis is None:
+            raise RuntimeError('PUSH_BACKEND=redis requires the redis package')
+        self.dispatch = dispatch
+        self._client = redis.Redis.from_url(url or 'redis://localhost:6379/0')
+        self._publish = self._client.register_script(self.PUBLISH_SCRIPT)
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is not None:
+                return
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(self.channel)
+            self._thread = threading.Thread(target=self._run, args=(pubsub,), name='push-redis-bus', daemon=True)
+            self._thread.start()
+
+    def _run(self, pubsub):
+        for message in pubsub.listen():
+            try:
+                event_id, raw = message['data'].split(b':', 1)
+                self.dispatch(int(event_id), raw)
+            except Exception:
+                logger.exception('Dispatching a push event failed')
+
+    def publish(self, raw):
+        self._publish(keys=[self.id_key], args=[self.channel, raw])
+
+
+BUSES = {
+    'memory': MemoryBus,
+    'sqlite': SQLiteBus,
+    'redis': RedisBus,
+}
+
+
+class Subscription:
+    """Events for one connected client. A slow client loses its oldest events."""
+
+    def __init__(self, user_id, maxsize=100):
+        self.user_id = user_id
+        self._queue = queue.Queue(maxsize)
+
+    def put(self, event):
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout=None):
+        """Next event, or None after `timeout` seconds."""
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def drain(self):
+        events = []
+        while True:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                return events
+
+
+class PushHub:
+    def __init__(self, app=None):
+        self.bus = MemoryBus(self._dispatch)
+        self.replay_size = 50
+        self.replay_seconds = 60
+        self.queue_size = 100
+        self._subscribers = defaultdict(set)
+        self._recent = {}
+        # user id -> when their last subscription closed
+        self._idle_since = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        backend = app.config.get('PUSH_BACKEND', 'memory')
+        if backend not in BUSES:
+            raise ValueError(f'Unknown PUSH_BACKEND {backend!r}')
+        self.bus = BUSES[backend](self._dispatch, app.config.get('PUSH_URL'), app.config.get('PUSH_POLL_INTERVAL'))
+        self.replay_size = app.config.get('PUSH_REPLAY_SIZE', self.replay_size)
+        self.replay_seconds = app.config.get('PUSH_REPLAY_SECONDS', self.replay_seconds)
+        self.queue_size = app.config.get('PUSH_QUEUE_SIZE', self.queue_size)
+        app.extensions['push'] = self
+
+    def publish(self, user_ids, kind, data):
+        """Send a `kind` event with `data` to every connection of `user_ids`."""
+        user_ids = sorted({int(u) for u in user_ids if u is not None})
+        if not user_ids:
+            return
+        event = {'user_ids': user_ids, 'type': kind, 'data': data}
+        try:
+            self.bus.publish(dumps(event))
+        except Exception:
+            # Push is best effort; the change itself is already committed
+            logger.exception('Publishing a %s push event failed', kind)
+
+    def _dispatch(self, event_id, raw):
+        event = json.loads(raw)
+        event['id'] = event_id
+        user_ids = event.pop('user_ids')
+        with self._lock:
+            for user_id in user_ids:
+                recent = self._recent.get(user_id)
+                if recent is None:
+                    # Only users subscribed in this process are tracked
+                    continue
+                recent.append(event)
+                for subscription in self._subscribers.get(user_id, ()):
+                    subscription.put(event)
+
+    def subscribe(self, user_id):
+        self.bus.start()
+        subscription = Subscription(user_id, self.queue_size)
+        with self._lock:
+            self._subscribers[user_id].add(subscription)
+            self._idle_since.pop(user_id, None)
+            if user_id not in self._recent:
+                self._recent[user_id] = deque(maxlen=self.replay_size)
+            self._prune()
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.user_id)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.user_id]
+                    self._idle_since[subscription.user_id] = time.monotonic()
+
+    def _prune(self):
+        # Forget replay buffers of users who stopped connecting; caller holds the lock
+        cutoff = time.monotonic() - self.replay_seconds
+        for user_id in [u for u, since in self._idle_since.items() if since < cutoff]:
+            del self._idle_since[user_id]
+            self._recent.pop(user_id, None)
+
+    def replay(self, user_id, after_id):
+        """Remembered events for `user_id` newer than `after_id`."""
+        with self._lock:
+            return [e for e in self._recent.get(user_id, ()) if e['id'] > after_id]
+
+    def connections(self):
+        with self._lock:
+            return sum(len(s) for s in self._subscribers.values())
+
+
+hub = PushHub()
+
+
+def init_app(app):
+    hub.init_app(app)
@@ -0,0 +1,157 @@
+"""Full-text search over post content.
+
+The backend is picked from the database URI: SQLite uses an FTS5 table,
+MySQL a FULLTEXT index and PostgreSQL a generated tsvector column with a
+GIN index. Any other database falls back to a LIKE scan.
+"""
+import re
+from flask import current_app
+from sqlalchemy import DDL, event, inspect, literal_column, select, table, column, text, func
+from sqlalchemy.engine import make_url
+from sqlalchemy.dialects.mysql import match as mysql_match
+from app.backend.models.post import Post
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(term):
+    return TOKEN_RE.findall(term or '')
+
+
+class SearchBackend:
+    name = 'like'
+
+    def apply(self, query, term):
+        """Filter `query` to posts matching `term`.
+
+        Returns (query, relevance) where relevance is an ORDER BY clause,
+        best match first.
+        """
+        query = query.filter(Post.content.ilike(f'%{term}%'))
+        return query, Post.created_at.desc()
+
+    def index_post(self, connection, post_id, content):
+        pass
+
+    def remove_post(self, connection, post_id):
+        pass
+
+
+class SQLiteFTS5Backend(SearchBackend):
+    name = 'sqlite'
+    fts = table('post_fts', column('rowid'), column('rank'), column('post_fts'))
+
+    def apply(self, query, term):
+        tokens = tokenize(term)
+        if not tokens:
+            return super().apply(query, term)
+        # Every token must match, the last one also as a prefix ("pyt" finds "python")
+        match = ' '.join(f'"{t}"' for t in tokens[:-1])
+        match = f'{match} "{tokens[-1]}"*'.strip()
+        hits = select(self.fts.c.rowid.label('post_id'), self.fts.c.rank.label('rank')).where(
+            self.fts.c.post_fts.op('MATCH')(match)
+        ).subquery()
+        query = query.join(hits, hits.c.post_id == Post.id)
+        # bm25 rank is negative, more negative is more relevant
+        return query, hits.c.rank.asc()
+
+    def index_post(self, connection, post_id, content):
+        self.remove_post(connection, post_id)
+        connection.execute(
+            text('INSERT INTO post_fts(rowid, content) VALUES (:id, :content)'),
+            {'id': post_id, 'content': content or ''}
+        )
+
+    def remove_post(self, connection, post_id):
+        connection.execute(text('DELETE FROM post_fts WHERE rowid = :id'), {'id': post_id})
+
+
+class MySQLFulltextBackend(SearchBackend):
+    name = 'mysql'
+
+    def apply(self, query, term):
+        tokens = tokenize(term)
+        if not tokens:
+            return super().apply(query, term)
+        against = ' '.join(f'+{t}' for t in tokens[:-1])
+        against = f'{against} +{tokens[-1]}*'.strip()
+        score = mysql_match(Post.content, against=against).in_boolean_mode()
+        query = query.filter(score > 0)
+        return query, score.desc()
+
+
+class PostgresTsvectorBackend(SearchBackend):
+    name = 'postgresql'
+
+    def apply(self, query, term):
+        tokens = tokenize(term)
+        if not tokens:
+            return super().apply(query, term)
+        tsquery = func.to_tsquery('english', ' & '.join(f'{t}:*' for t in tokens))
+        vector = literal_column('post.search_vector')
+        query = query.filter(vector.op('@@')(tsquery))
+        return query, func.ts_rank(vector, tsquery).desc()
+
+
+BACKENDS = {
+    'sqlite': SQLiteFTS5Backend,
+    'mysql': MySQLFulltextBackend,
+    'postgresql': PostgresTsvectorBackend,
+}
+
+
+def backend_for_uri(uri):
+    return BACKENDS.get(make_url(uri).get_backend_name(), SearchBackend)()
+
+
+def init_app(app):
+    app.extensions['post_search'] = backend_for_uri(app.config['SQLALCHEMY_DATABASE_URI'])
+
+
+def get_backend():
+    backend = current_app.extensions.get('post_search')
+    if backend is None:
+        backend = backend_for_uri(current_app.config['SQLALCHEMY_DATABASE_URI'])
+        current_app.extensions['post_search'] = backend
+    return backend
+
+
+def search_posts(query, term):
+    return get_backend().apply(query, term)
+
+
+# Keep the index in step with the post table. MySQL and PostgreSQL maintain
+# their indexes themselves, so these are no-ops there.
+@event.listens_for(Post, 'after_insert')
+def _index_new_post(mapper, connection, target):
+    get_backend().index_post(connection, target.id, target.content)
+
+
+@event.listens_for(Post, 'after_update')
+def _reindex_post(mapper, connection, target):
+    if inspect(target).attrs.content.history.has_changes():
+        get_backend().index_post(connection, target.id, target.content)
+
+
+@event.listens_for(Post, 'after_delete')
+def _unindex_post(mapper, connection, target):
+    get_backend().remove_post(connection, target.id)
+
+
+# db.create_all() builds the same structures the migration does
+event.listen(Post.__table__, 'after_create', DDL(
+    "CREATE VIRTUAL TABLE IF NOT EXISTS post_fts USING fts5(content, prefix='2 3')"
+).execute_if(dialect='sqlite'))
+event.listen(Post.__table__, 'before_drop', DDL(
+    'DROP TABLE IF EXISTS post_fts'
+).execute_if(dialect='sqlite'))
+event.listen(Post.__table__, 'after_create', DDL(
+    'CREATE FULLTEXT INDEX ix_post_content_fulltext ON post (content)'
+).execute_if(dialect='mysql'))
+event.listen(Post.__table__, 'after_create', DDL(
+    "ALTER TABLE post ADD COLUMN search_vector tsvector "
+    "GENERATED ALWAYS AS (to_tsvector('english', coalesce(content, ''))) STORED"
+).execute_if(dialect='postgresql'))
+event.listen(Post.__table__, 'after_create', DDL(
+    'CREATE INDEX ix_post_search_vector ON post USING GIN (search_vector)'
+).execute_if(dialect='postgresql'))
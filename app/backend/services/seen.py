@@ -0,0 +1,73 @@
+"""Per-user "already seen" filter for the feed.
+
+Post ids served to a user are added to a fixed-size Bloom filter kept in
+the cache as raw bytes. Filters rotate every FEED_SEEN_WINDOW seconds: ids
+are added to the current window's filter and looked up in the current and
+previous ones, so a served post stays hidden for one to two windows. A
+lookup is a bit test in memory, never a query; false positives (a post
+wrongly treated as seen) happen at a rate set by FEED_SEEN_BITS and
+FEED_SEEN_HASHES.
+"""
+import hashlib
+import time
+from flask import current_app
+from app.backend.extensions import cache
+
+
+class BloomFilter:
+    def __init__(self, num_bits=16384, num_hashes=4, data=None):
+        self.num_bits = num_bits
+        self.num_hashes = num_hashes
+        self.bits = bytearray(data) if data is not None else bytearray((num_bits + 7) // 8)
+
+    def _positions(self, item):
+        # Double hashing: k positions from two 64-bit halves of one digest
+        digest = hashlib.blake2b(str(item).encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.num_bits for i in range(self.num_hashes)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+    def to_bytes(self):
+        return bytes(self.bits)
+
+
+class SeenFilter:
+    """The current and previous window filters of one user."""
+
+    def __init__(self, user_id, now=None):
+        config = current_app.config
+        self.user_id = user_id
+        self.window = config.get('FEED_SEEN_WINDOW', 86400)
+        self.num_bits = config.get('FEED_SEEN_BITS', 16384)
+        self.num_hashes = config.get('FEED_SEEN_HASHES', 4)
+        bucket = int((time.time() if now is None else now) // self.window)
+        self.current = self._load(bucket)
+        self.previous = self._load(bucket - 1)
+        self.bucket = bucket
+
+    def _key(self, bucket):
+        return f'seen:{self.user_id}:{bucket}'
+
+    def _load(self, bucket):
+        raw = cache.get(self._key(bucket))
+        if raw is None or len(raw) != (self.num_bits + 7) // 8:
+            return BloomFilter(self.num_bits, self.num_hashes)
+        return BloomFilter(self.num_bits, self.num_hashes, raw)
+
+    def __contains__(self, post_id):
+        return post_id in self.current or post_id in self.previous
+
+    def mark(self, post_ids):
+        if not post_ids:
+            return
+        for post_id in post_ids:
+            self.current.add(post_id)
+        # Kept long enough to serve as the previous window's filter
+        cache.set(self._key(self.bucket), self.current.to_bytes(), 2 * self.window)
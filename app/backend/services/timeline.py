@@ -0,0 +1,246 @@
+"""Materialized home timelines (fan-out on write).
+
+When a post is created its id is pushed into the timeline of every member
+of the author's audience: one ``timeline_entry`` row per recipient in the
+database. The recipients' cached timelines are deleted rather than edited in
+place, so concurrent fan-outs cannot overwrite each other; the next read
+rebuilds them from the table. Cached timelines are compact int64 arrays of
+post ids, newest first, trimmed to FEED_TIMELINE_MAX_LENGTH. Reading a
+timeline is then one cache (or indexed range) read followed by one batched
+hydrate query.
+
+A delete only reaches other workers through a shared cache. With the
+per-process memory cache the other workers keep their copy until it
+expires, so FEED_TIMELINE_TTL may not exceed MAX_LOCAL_TIMELINE_TTL there.
+
+Authors whose audience is larger than FEED_FANOUT_THRESHOLD are recorded as
+pull authors instead. Their posts are not fanned out; readers merge them in
+at read time.
+
+The audience of an author is the author, their accepted connections and
+everyone who has liked or commented on one of their posts.
+
+ranked_timeline() reorders the same candidates with services.ranking and
+caches the ranked id list for FEED_RANK_TTL seconds so later pages are
+served from the precomputed order.
+"""
+import heapq
+import logging
+from array import array
+from flask import current_app
+from sqlalchemy import bindparam, delete, func, insert, select, union, union_all
+from app.backend.extensions import db, cache
+from app.backend.models.post import Post
+from app.backend.models.comment import Comment
+from app.backend.models.post_like import PostLike
+from app.backend.models.timeline import TimelineEntry, PullAuthor
+from app.backend.models.connection import Connection
+from app.backend.models.profile import Profile
+from app.backend.models.tag import Tag
+from app.backend.services import ranking
+
+logger = logging.getLogger(__name__)
+
+# Longest a worker may serve a timeline that misses other workers' posts
+MAX_LOCAL_TIMELINE_TTL = 60
+
+
+def _pack(post_ids):
+    return array('q', post_ids).tobytes()
+
+
+def _unpack(raw):
+    post_ids = array('q')
+    post_ids.frombytes(raw)
+    return post_ids.tolist()
+
+
+def _timeline_key(user_id):
+    return f'timeline:{user_id}'
+
+
+def _max_length():
+    return current_app.config.get('FEED_TIMELINE_MAX_LENGTH', 800)
+
+
+def _ttl():
+    return current_app.config.get('FEED_TIMELINE_TTL', 86400)
+
+
+def init_app(app):
+    ttl = app.config.get('FEED_TIMELINE_TTL', 86400)
+    if not cache.shared and ttl > MAX_LOCAL_TIMELINE_TTL:
+        raise ValueError(
+            f'FEED_TIMELINE_TTL must be at most {MAX_LOCAL_TIMELINE_TTL} with a per-process CACHE_BACKEND'
+        )
+
+
+def audience_of(author_id):
+    """User ids whose timelines receive `author_id`'s posts."""
+    likers = select(PostLike.user_id).join(Post, Post.id == PostLike.post_id).where(Post.user_id == author_id)
+    commenters = select(Comment.user_id).join(Post, Post.id == Comment.post_id).where(Post.user_id == author_id)
+    connections = select(Connection.friend_id).where(Connection.user_id == author_id, Connection.status == 'accepted')
+    audience = set(db.session.execute(union(likers, commenters, connections)).scalars())
+    audience.add(author_id)
+    return audience
+
+
+def sources_of(user_id):
+    """Authors whose posts `user_id` receives: the inverse of audience_of()."""
+    liked = select(Post.user_id).join(PostLike, PostLike.post_id == Post.id).where(PostLike.user_id == user_id)
+    commented = select(Post.user_id).join(Comment, Comment.post_id == Post.id).where(Comment.user_id == user_id)
+    connections = select(Connection.friend_id).where(Connection.user_id == user_id, Connection.status == 'accepted')
+    return union(liked, commented, connections)
+
+
+def fan_out(post):
+    """Push a newly committed post into its audience's timelines."""
+    try:
+        author_id = int(post.user_id)
+        audience = audience_of(author_id)
+        if len(audience) > current_app.config.get('FEED_FANOUT_THRESHOLD', 5000):
+            pull_author = db.session.get(PullAuthor, author_id) or PullAuthor(user_id=author_id)
+            pull_author.audience_size = len(audience)
+            db.session.add(pull_author)
+            # The author still sees their own post
+            audience = {author_id}
+        db.session.execute(
+            insert(TimelineEntry.__table__),
+            [{'user_id': user_id, 'post_id': post.id, 'created_at': post.created_at} for user_id in audience]
+        )
+        _trim(audience)
+        db.session.commit()
+    except Exception:
+        logger.exception('Timeline fan-out failed for post %s', post.id)
+        db.session.rollback()
+        return
+    # Rebuilt from the table on next read
+    cache.delete(*[_timeline_key(user_id) for user_id in audience])
+
+
+def _trim(user_ids):
+    """Delete timeline rows beyond the maximum length for `user_ids`."""
+    max_length = _max_length()
+    ranked = select(
+        TimelineEntry.user_id,
+        TimelineEntry.post_id,
+        func.row_number().over(
+            partition_by=TimelineEntry.user_id, order_by=TimelineEntry.post_id.desc()
+        ).label('position')
+    ).where(TimelineEntry.user_id.in_(user_ids)).subquery()
+    cutoffs = db.session.execute(
+        select(ranked.c.user_id, ranked.c.post_id).where(ranked.c.position == max_length + 1)
+    ).all()
+    if cutoffs:
+        table = TimelineEntry.__table__
+        db.session.execute(
+            delete(table).where(table.c.user_id == bindparam('uid'), table.c.post_id <= bindparam('cutoff')),
+            [{'uid': user_id, 'cutoff': post_id} for user_id, post_id in cutoffs]
+        )
+
+
+def timeline_ids(user_id):
+    """The user's materialized timeline, newest first."""
+    post_ids = cache.get(_timeline_key(user_id))
+    if post_ids is not None:
+        return _unpack(post_ids)
+    post_ids = db.session.execute(
+        select(TimelineEntry.post_id).where(TimelineEntry.user_id == user_id)
+        .order_by(TimelineEntry.post_id.desc()).limit(_max_length())
+    ).scalars().all()
+    cache.set(_timeline_key(user_id), _pack(post_ids), _ttl())
+    return post_ids
+
+
+def pull_authors_for(user_id):
+    """Pull authors `user_id` follows, cached briefly to keep reads to one range read."""
+    key = f'timeline:pull:{user_id}'
+    authors = cache.get(key)
+    if authors is None:
+        authors = db.session.execute(
+            select(PullAuthor.user_id).where(PullAuthor.user_id.in_(sources_of(user_id)))
+        ).scalars().all()
+        cache.set(key, authors, current_app.config.get('FEED_PULL_AUTHORS_TTL', 60))
+    return authors
+
+
+def read_timeline(user_id, before_id=None, limit=20, skip=None):
+    """Post ids for one page of the user's home timeline, newest first.
+
+    Ids contained in `skip` (e.g. a SeenFilter) are passed over without
+    counting towards `limit`.
+    """
+    limit = max(limit, 1)
+    post_ids = timeline_ids(user_id)
+    authors = pull_authors_for(user_id)
+    if authors:
+        query = select(Post.id).where(Post.user_id.in_(authors), Post.collapsed.is_(False))
+        if before_id is not None:
+            query = query.where(Post.id < before_id)
+        pulled = db.session.execute(query.order_by(Post.id.desc()).limit(limit)).scalars().all()
+        post_ids = heapq.merge(post_ids, pulled, reverse=True)
+    page = []
+    for post_id in post_ids:
+        if before_id is not None and post_id >= before_id:
+            continue
+        if page and page[-1] == post_id:
+            continue
+        if skip is not None and post_id in skip:
+            continue
+        page.append(post_id)
+        if len(page) == limit:
+            break
+    return page
+
+
+def author_affinity(user_id, author_ids):
+    """How many times `user_id` liked or commented on each author's posts."""
+    if not author_ids:
+        return {}
+    likes = select(Post.user_id.label('author_id')).join(PostLike, PostLike.post_id == Post.id).where(
+        PostLike.user_id == user_id, Post.user_id.in_(author_ids)
+    )
+    comments = select(Post.user_id.label('author_id')).join(Comment, Comment.post_id == Post.id).where(
+        Comment.user_id == user_id, Post.user_id.in_(author_ids)
+    )
+    interactions = union_all(likes, comments).subquery()
+    rows = db.session.execute(
+        select(interactions.c.author_id, func.count()).group_by(interactions.c.author_id)
+    ).all()
+    return dict(rows)
+
+
+def viewer_skills(user_id):
+    skills = db.session.execute(
+        select(Profile.skills).where(Profile.user_id == user_id).order_by(Profile.id).limit(1)
+    ).scalar()
+    return set(Tag.normalize(skills or ''))
+
+
+def ranked_timeline(user_id, refresh=False, skip=None):
+    """Timeline candidates ordered by ranking score, cached between pages.
+
+    Candidates in `skip` are dropped before they are scored.
+    """
+    key = f'feed:ranked:{user_id}'
+    if not refresh:
+        raw = cache.get(key)
+        if raw is not None:
+            return _unpack(raw)
+    config = current_app.config
+    candidate_ids = read_timeline(user_id, limit=config.get('FEED_RANK_CANDIDATES', 2000), skip=skip)
+    if not candidate_ids:
+        ranked = []
+    else:
+        rows = db.session.execute(
+            select(Post.id, Post.user_id, Post.created_at, Post.likes, Post.comment_count, Post.tags)
+            .where(Post.id.in_(candidate_ids))
+        ).all()
+        features = ranking.extract_features(
+            rows, viewer_skills(user_id), author_affinity(user_id, {row.user_id for row in rows})
+        )
+        ranked = ranking.rank(
+            features, config.get('FEED_RANK_WEIGHTS'), config.get('FEED_RANK_HALF_LIFE_HOURS', 24.0)
+        )
+    cache.set(key, _pack(ranked), config.get('FEED_RANK_TTL', 120))
+    return ranked
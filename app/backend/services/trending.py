@@ -0,0 +1,315 @@
+"""Time-decayed trending tags.
+
+Each window in TRENDING_WINDOWS is a half-life. A tag used at time t adds
+``2 ** ((t - landmark) / half_life)`` to a count-min sketch, so older uses
+weigh exponentially less without ever rewriting old counters (forward
+decay); the decayed count at `now` is the stored count times
+``2 ** (-(now - landmark) / half_life)``. The landmark advances every
+LANDMARK_HALF_LIVES half-lives and the stored counts are rescaled then, so
+the weights stay in float range.
+
+Tags whose estimate is among the highest are kept in a bounded top-K heap
+next to the sketch. Reading a window sorts those K candidates and never
+touches the post table.
+
+create_post only adds to an in-memory buffer. Every
+TRENDING_SNAPSHOT_INTERVAL seconds the buffer is merged into the
+trending_snapshot row of each window under a row lock, so every worker's
+increments end up in the same snapshot, and workers reload snapshots that
+are older than the interval.
+"""
+import hashlib
+import heapq
+import json
+import math
+import threading
+import time
+from array import array
+from datetime import datetime
+import click
+from flask import current_app
+from flask.cli import with_appcontext
+from sqlalchemy import select
+from app.backend.extensions import db
+from app.backend.models.post import Post
+from app.backend.models.tag import Tag, post_tag
+from app.backend.models.trending import TrendingSnapshot
+from app.backend.services.buffer import CounterBuffer
+
+# Post.created_at is naive UTC
+EPOCH = datetime(1970, 1, 1)
+
+LANDMARK_HALF_LIVES = 16
+REBUILD_BATCH_SIZE = 5000
+
+DEFAULT_WINDOWS = {'1h': 3600, '24h': 86400, '7d': 604800}
+
+
+class CountMinSketch:
+    def __init__(self, width=2048, depth=4, data=None):
+        self.width = width
+        self.depth = depth
+        if data is not None:
+            self.counters = array('d')
+            self.counters.frombytes(data)
+        else:
+            self.counters = array('d', bytes(8 * width * depth))
+
+    def _cells(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [row * self.width + (h1 + row * h2) % self.width for row in range(self.depth)]
+
+    def add(self, item, weight):
+        """Add `weight` to `item` and return its new estimate."""
+        counters = self.counters
+        estimate = math.inf
+        for cell in self._cells(item):
+            counters[cell] += weight
+            estimate = min(estimate, counters[cell])
+        return estimate
+
+    def estimate(self, item):
+        return min(self.counters[cell] for cell in self._cells(item))
+
+    def scale(self, factor):
+        counters = self.counters
+        for i in range(len(counters)):
+            counters[i] *= factor
+
+    def to_bytes(self):
+        return self.counters.tobytes()
+
+
+class TopK:
+    """The `k` items with the highest scores seen so far.
+
+    Scores only grow, so an item's heap entry is replaced by pushing a new
+    one; stale entries are skipped when the minimum is read.
+    """
+
+    def __init__(self, k, scores=None):
+        if k < 1:
+            raise ValueError('k must be at least 1')
+        self.k = k
+        self.scores = dict(scores or {})
+        self._rebuild()
+
+    def _rebuild(self):
+        self._heap = [(s, item) for item, s in self.scores.items()]
+        heapq.heapify(self._heap)
+
+    def _min(self):
+        heap = self._heap
+        while heap and self.scores.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0]
+
+    def offer(self, item, score):
+        if item not in self.scores and len(self.scores) >= self.k:
+            floor, floor_item = self._min()
+            if score <= floor:
+                return
+            heapq.heappop(self._heap)
+            del self.scores[floor_item]
+        self.scores[item] = score
+        heapq.heappush(self._heap, (score, item))
+        if len(self._heap) > 4 * self.k:
+            self._rebuild()
+
+    def scale(self, factor):
+        self.scores = {item: s * factor for item, s in self.scores.items()}
+        self._rebuild()
+
+    def items(self):
+        return sorted(self.scores.items(), key=lambda i: (-i[1], i[0]))
+
+
+class TrendingWindow:
+    """Sketch plus top-K for one half-life, counted relative to `landmark`."""
+
+    def __init__(self, name, half_life, capacity, width, depth, landmark=None, sketch=None, top=None):
+        self.name = name
+        self.half_life = half_life
+        self.landmark = landmark if landmark is not None else landmark_for(half_life, time.time())
+        self.sketch = sketch or CountMinSketch(width, depth)
+        self.top = top or TopK(capacity)
+
+    @classmethod
+    def from_row(cls, row, half_life, capacity):
+        sketch = CountMinSketch(row.width, row.depth, row.counters)
+        return cls(row.window, half_life, capacity, row.width, row.depth, row.landmark, sketch,
+                   TopK(capacity, json.loads(row.top)))
+
+    def to_row(self, row):
+        row.landmark = self.landmark
+        row.width = self.sketch.width
+        row.depth = self.sketch.depth
+        row.counters = self.sketch.to_bytes()
+        row.top = json.dumps(self.top.scores)
+
+    def advance(self, landmark):
+        """Move the landmark forward, rescaling stored counts to match."""
+        if landmark <= self.landmark:
+            return
+        factor = 2.0 ** (-(landmark - self.landmark) / self.half_life)
+        self.sketch.scale(factor)
+        self.top.scale(factor)
+        self.landmark = landmark
+
+    def add(self, tag, weight, landmark):
+        """Add a weight counted relative to `landmark`."""
+        weight *= 2.0 ** ((landmark - self.landmark) / self.half_life)
+        self.top.offer(tag, self.sketch.add(tag, weight))
+
+    def trending(self, limit, now=None):
+        """[(tag, decayed count)] best first; O(K)."""
+        now = time.time() if now is None else now
+        decay = 2.0 ** (-(now - self.landmark) / self.half_life)
+        return [(tag, count * decay) for tag, count in self.top.items()[:limit]]
+
+
+def landmark_for(half_life, ts):
+    step = LANDMARK_HALF_LIVES * half_life
+    return math.floor(ts / step) * step
+
+
+def _windows():
+    return current_app.config.get('TRENDING_WINDOWS') or DEFAULT_WINDOWS
+
+
+def _new_window(name):
+    config = current_app.config
+    return TrendingWindow(
+        name, _windows()[name], 2 * config.get('TRENDING_TOP_K', 20),
+        config.get('TRENDING_SKETCH_WIDTH', 2048), config.get('TRENDING_SKETCH_DEPTH', 4)
+    )
+
+
+def _load_window(name, for_update=False):
+    query = db.session.query(TrendingSnapshot).filter_by(window=name)
+    if for_update:
+        query = query.with_for_update()
+    row = query.one_or_none()
+    if row is None:
+        return None, _new_window(name)
+    capacity = 2 * current_app.config.get('TRENDING_TOP_K', 20)
+    return row, TrendingWindow.from_row(row, _windows()[name], capacity)
+
+
+def _save_window(row, window):
+    if row is None:
+        row = TrendingSnapshot(window=window.name)
+        db.session.add(row)
+    window.to_row(row)
+
+
+# Per-process copies of the persisted snapshots: name -> (loaded_at, TrendingWindow)
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def _remember(window):
+    with _snapshots_lock:
+        _snapshots[window.name] = (time.monotonic(), window)
+
+
+def flush_tag_counts(deltas):
+    """Merge buffered {(window, landmark, tag): weight} into the persisted snapshots."""
+    by_window = {}
+    for (name, landmark, tag), weight in deltas.items():
+        by_window.setdefault(name, []).append((tag, weight, landmark))
+    now = time.time()
+    merged = []
+    for name, items in by_window.items():
+        if name not in _windows():
+            continue
+        row, window = _load_window(name, for_update=True)
+        window.advance(landmark_for(window.half_life, now))
+        for tag, weight, landmark in items:
+            window.add(tag, weight, landmark)
+        _save_window(row, window)
+        merged.append(window)
+    db.session.commit()
+    for window in merged:
+        _remember(window)
+
+
+tag_counter = CounterBuffer('trending_tags', flush_tag_counts, interval=30.0, threshold=1000)
+
+
+def init_app(app):
+    if app.config.get('TRENDING_TOP_K', 20) < 1:
+        raise ValueError('TRENDING_TOP_K must be at least 1')
+    tag_counter.init_app(
+        app,
+        interval=app.config.get('TRENDING_SNAPSHOT_INTERVAL'),
+        threshold=app.config.get('TRENDING_FLUSH_THRESHOLD')
+    )
+
+
+def record_tags(tag_names, ts=None):
+    """Count one use of each tag at `ts` (unix seconds, default now)."""
+    ts = time.time() if ts is None else ts
+    for name, half_life in _windows().items():
+        landmark = landmark_for(half_life, ts)
+        weight = 2.0 ** ((ts - landmark) / half_life)
+        for tag in tag_names:
+            tag_counter.add((name, landmark, tag), weight)
+
+
+def get_window(name):
+    """The snapshot of window `name`, reloaded once it is older than the snapshot interval."""
+    interval = current_app.config.get('TRENDING_SNAPSHOT_INTERVAL', 30.0)
+    with _snapshots_lock:
+        cached = _snapshots.get(name)
+    if cached is not None and time.monotonic() - cached[0] < interval:
+        return cached[1]
+    _, window = _load_window(name)
+    _remember(window)
+    return window
+
+
+def trending_tags(name, limit=None, now=None):
+    """[(tag, decayed count)] for window `name`, best first; `limit` is at most TRENDING_TOP_K."""
+    top_k = current_app.config.get('TRENDING_TOP_K', 20)
+    limit = top_k if limit is None else min(max(limit, 1), top_k)
+    return get_window(name).trending(limit, now)
+
+
+def rebuild_snapshots(now=None):
+    """Replace every window's snapshot with one replayed from post tags.
+
+    Only posts young enough to still count (LANDMARK_HALF_LIVES of the
+    longest half-life) are read. Returns the number of tag uses replayed.
+    """
+    now = time.time() if now is None else now
+    windows = {name: _new_window(name) for name in _windows()}
+    for window in windows.values():
+        window.landmark = landmark_for(window.half_life, now)
+    since = datetime.utcfromtimestamp(now - LANDMARK_HALF_LIVES * max(_windows().values()))
+    stmt = select(Post.created_at, Tag.name).join(post_tag, post_tag.c.post_id == Post.id).join(
+        Tag, Tag.id == post_tag.c.tag_id
+    ).where(Post.created_at >= since, Post.collapsed.is_(False))
+    replayed = 0
+    for created_at, tag in db.session.execute(stmt.execution_options(yield_per=REBUILD_BATCH_SIZE)):
+        ts = (created_at - EPOCH).total_seconds()
+        for window in windows.values():
+            window.add(tag, 2.0 ** ((ts - window.landmark) / window.half_life), window.landmark)
+        replayed += 1
+    for name, window in windows.items():
+        row = db.session.get(TrendingSnapshot, name)
+        _save_window(row, window)
+    db.session.commit()
+    for window in windows.values():
+        _remember(window)
+    return replayed
+
+
+@click.command('rebuild-trending')
+@with_appcontext
+def rebuild_trending_command():
+    """Rebuild the trending tag snapshots from existing posts."""
+    replayed = rebuild_snapshots()
+    click.echo(f'Replayed {replayed} tag uses')
@@ -2,7 +2,7 @@ const API_URL = import.meta.env.VITE_API_URL || 'http://localhost:5000';
 
 export const messagingApi = {
   getConversations: async () => {
-    const response = await fetch(`${API_URL}/messages/conversations`, {
+    const response = await fetch(`${API_URL}/messaging/conversations`, {
       headers: {
         'Authorization': `Bearer ${localStorage.getItem('token')}`,
       },
@@ -11,7 +11,7 @@ export const messagingApi = {
   },
 
   getMessages: async (conversationId: number) => {
-    const response = await fetch(`${API_URL}/messages/${conversationId}`, {
+    const response = await fetch(`${API_URL}/messaging/${conversationId}`, {
       headers: {
         'Authorization': `Bearer ${localStorage.getItem('token')}`,
       },
@@ -20,7 +20,7 @@ export const messagingApi = {
   },
 
   sendMessage: async (conversationId: number, content: string) => {
-    const response = await fetch(`${API_URL}/messages/${conversationId}`, {
+    const response = await fetch(`${API_URL}/messaging/${conversationId}`, {
       method: 'POST',
       headers: {
         'Content-Type': 'application/json',
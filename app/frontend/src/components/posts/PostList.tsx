@@ -52,6 +52,7 @@ interface Post {
   tags: string[];
   user: User;
   comments: Comment[];
+  comment_count?: number;
 }
 
 // For type safety
@@ -213,7 +214,7 @@ const PostList: React.FC = () => {
         }
       });
       const comments = await commentsRes.json();
-      setPosts(posts => posts.map(p => p.id === postId ? { ...p, comments } : p));
+      setPosts(posts => posts.map(p => p.id === postId ? { ...p, comments, comment_count: (p.comment_count ?? p.comments.length) + 1 } : p));
       setCommentInputs(inputs => ({ ...inputs, [postId]: '' }));
       if (commentRefs.current[postId]) commentRefs.current[postId]!.value = '';
     } catch (error: any) {
@@ -362,7 +363,7 @@ const PostList: React.FC = () => {
                   </button>
                   <button onClick={() => toggleComments(post.id)} className="flex items-center gap-1 text-gray-500 hover:text-blue-500 transition-colors">
                     <FaRegCommentDots />
-                    <span className="font-semibold">{post.comments.length}</span>
+                    <span className="font-semibold">{post.comment_count ?? post.comments.length}</span>
                   </button>
                   <button
                     onClick={() => {
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Test script for messaging: a sent message must show up in both inboxes
+"""
+
+import sys
+import time
+import requests
+
+BASE_URL = "http://localhost:5000"
+PASSWORD = "TestPass123"
+
+def signup_and_login(username):
+    requests.post(f"{BASE_URL}/auth/signup", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": PASSWORD
+    })
+    response = requests.post(f"{BASE_URL}/auth/login", json={"username": username, "password": PASSWORD})
+    if response.status_code != 200:
+        print(f"❌ Login failed for {username}: {response.status_code}")
+        print(response.text)
+        return None, None
+    data = response.json()
+    return data['user']['id'], {"Authorization": f"Bearer {data['token']}"}
+
+def test_messaging():
+    print("🧪 Testing Messaging")
+    print("=" * 40)
+
+    suffix = int(time.time())
+    print("1. Creating two users...")
+    sender_id, sender_headers = signup_and_login(f"sender{suffix}")
+    receiver_id, receiver_headers = signup_and_login(f"receiver{suffix}")
+    if sender_headers is None or receiver_headers is None:
+        return False
+    print("✅ Users ready")
+
+    print("\n2. Sending a message...")
+    response = requests.post(f"{BASE_URL}/messaging/to/{receiver_id}", json={"content": "hello"}, headers=sender_headers)
+    print(f"Status: {response.status_code}")
+    if response.status_code != 201:
+        print(f"❌ Send failed: {response.text}")
+        return False
+    conversation_id = response.json()['conversation_id']
+    print("✅ Message sent")
+
+    # The inbox only lists conversations whose last_sent_at was set by the send
+    print("\n3. Checking both inboxes...")
+    ok = True
+    for name, headers, unread in (("sender", sender_headers, 0), ("receiver", receiver_headers, 1)):
+        response = requests.get(f"{BASE_URL}/messaging/conversations", headers=headers)
+        conversations = {c['id']: c for c in response.json().get('conversations', [])}
+        conversation = conversations.get(conversation_id)
+        if conversation is None or conversation['last_sent_at'] is None:
+            print(f"❌ Conversation missing from the {name}'s inbox")
+            ok = False
+        elif conversation['unread_count'] != unread:
+            print(f"❌ {name} unread_count is {conversation['unread_count']}, expected {unread}")
+            ok = False
+        else:
+            print(f"✅ Conversation listed for the {name}")
+    return ok
+
+if __name__ == "__main__":
+    sys.exit(0 if test_messaging() else 1)